@@ -0,0 +1,306 @@
+"""
+Headless runner for toolbox tools outside the ArcGIS Pro GUI.
+
+Jobs are read from a JSON or TOML job file and their parameters are matched
+by name against each tool's ``getParameterInfo``.
+Each job runs in its own process, so independent jobs can run in parallel.
+
+Examples:
+    .. code-block:: toml
+
+        workers = 2
+
+        [[jobs]]
+        tool = "UpdateAGOData"
+        [jobs.parameters]
+        conn_aspen = "C:\\\\connections\\\\aspen.sde"
+        conn_portal = [["https://columbia.maps.arcgis.com", 3, ""]]
+
+        [[jobs]]
+        name = "hydrants"
+        tool = "CalculateFacilityIdentifiers"
+        [jobs.parameters]
+        placeholder = "ABC"
+        interval = 2
+        inputs = [["C:\\\\connections\\\\cypress.sde\\\\SDE.waHydrant", "Hydrant", 1000]]
+
+    .. code-block:: console
+
+        > cd path\\to\\colawater-toolbox
+        > "C:\\Program Files\\ArcGIS\\Pro\\bin\\Python\\scripts\\propy.bat" -m colawater run jobs.toml
+        > "C:\\Program Files\\ArcGIS\\Pro\\bin\\Python\\scripts\\propy.bat" -m colawater report UpdateAGOData
+"""
+
+import argparse
+import json
+import time
+import tomllib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+import arcpy
+
+from colawater.lib import history
+from colawater.toolbox.calculate_fids.tool import CalculateFacilityIdentifiers
+from colawater.toolbox.update_ago_data.tool import UpdateAGOData
+
+TOOLS: dict[str, type] = {
+    tool.__name__: tool
+    for tool in (
+        CalculateFacilityIdentifiers,
+        UpdateAGOData,
+    )
+}
+"""
+Tools that can be run headless, keyed by class name.
+"""
+
+
+class Job:
+    """
+    A single tool execution.
+    """
+
+    def __init__(self, name: str, tool: str, parameters: dict[str, Any]) -> None:
+        self.name = name
+        self.tool = tool
+        self.parameters = parameters
+
+
+def load_jobs(path: Path) -> tuple[list[Job], Optional[int]]:
+    """
+    Reads the jobs from a JSON or TOML job file.
+
+    Arguments:
+        path (Path): The path to the job file.
+
+    Returns:
+        tuple[list[Job], Optional[int]]: The jobs and the number of workers
+            requested by the file, if any.
+
+    Raises:
+        ValueError: The job file is malformed or names an unknown tool.
+    """
+    with open(path, "rb") as f:
+        if path.suffix.lower() == ".toml":
+            doc = tomllib.load(f)
+        else:
+            doc = json.load(f)
+
+    if not isinstance(doc, dict):
+        raise ValueError(f"Expected a table at the top level, got {type(doc).__name__}")
+
+    entries = doc.get("jobs", [])
+    workers = doc.get("workers")
+
+    if not isinstance(entries, list):
+        raise ValueError(f"Expected 'jobs' to be a list, got {type(entries).__name__}")
+
+    if workers is not None and (
+        isinstance(workers, bool) or not isinstance(workers, int) or workers < 1
+    ):
+        raise ValueError(
+            f"Expected 'workers' to be a positive integer, got {workers!r}"
+        )
+
+    jobs = []
+
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise ValueError(f"Job {i}: expected a table, got {type(entry).__name__}")
+
+        tool = entry.get("tool")
+        parameters = entry.get("parameters", {})
+
+        if tool not in TOOLS:
+            raise ValueError(
+                f"Job {i}: unknown tool {tool!r}, expected one of {sorted(TOOLS)}"
+            )
+
+        if not isinstance(parameters, dict):
+            raise ValueError(
+                f"Job {i}: expected 'parameters' to be a table,"
+                f" got {type(parameters).__name__}"
+            )
+
+        jobs.append(Job(entry.get("name", f"{i}-{tool}"), tool, parameters))
+
+    return jobs, workers
+
+
+def build_parameters(tool: Any, values: dict[str, Any]) -> list[arcpy.Parameter]:
+    """
+    Sets the values of a tool's parameters by name.
+
+    Arguments:
+        tool (Any): The tool instance.
+        values (dict[str, Any]): Parameter values keyed by parameter name.
+
+    Returns:
+        list[arcpy.Parameter]: The tool's parameters with their values set.
+
+    Raises:
+        ValueError: A value names an unknown parameter or a required parameter is missing.
+    """
+    parameters: list[arcpy.Parameter] = tool.getParameterInfo()
+    by_name = {p.name: p for p in parameters}
+
+    if unknown := set(values) - set(by_name):
+        raise ValueError(f"Unknown parameters: {sorted(unknown)}")
+
+    for name, value in values.items():
+        if by_name[name].multiValue and isinstance(value, list):
+            by_name[name].values = value
+        else:
+            by_name[name].value = value
+
+    missing = [
+        p.name
+        for p in parameters
+        if p.parameterType == "Required" and p.name not in values and p.value is None
+    ]
+
+    if missing:
+        raise ValueError(f"Missing required parameters: {missing}")
+
+    tool.updateParameters(parameters)
+
+    return parameters
+
+
+def run_job(job: Job) -> bool:
+    """
+    Runs a job to completion in the current process.
+
+    Arguments:
+        job (Job): The job to run.
+
+    Returns:
+        bool: Whether the job succeeded.
+    """
+    start = time.perf_counter()
+    print(f"[{job.name}] Starting {job.tool}", flush=True)
+
+    try:
+        tool = TOOLS[job.tool]()
+        tool.execute(build_parameters(tool, job.parameters), [])
+    except Exception as err:
+        # any failure is this job's alone, so report it and let the other jobs run
+        print(f"[{job.name}] Failed: {repr(err)}", flush=True)
+
+        # geoprocessing errors only carry their details in the error messages
+        if details := arcpy.GetMessages(2):
+            print(f"[{job.name}] {details}", flush=True)
+        return False
+    else:
+        elapsed = time.perf_counter() - start
+        print(f"[{job.name}] Finished in {elapsed:.1f}s", flush=True)
+        return True
+
+
+def run_jobs(jobs: list[Job], workers: int) -> bool:
+    """
+    Runs jobs, each in its own process, at most ``workers`` at a time.
+
+    Arguments:
+        jobs (list[Job]): The jobs to run.
+        workers (int): The maximum number of concurrent jobs.
+
+    Returns:
+        bool: Whether every job succeeded.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        return all([run_job(job) for job in jobs])
+
+    with ProcessPoolExecutor(min(workers, len(jobs))) as executor:
+        return all(executor.map(run_job, jobs))
+
+
+def report_regressions(tools: list[str], window: int, threshold: float) -> int:
+    """
+    Prints the regressed stages and datasets of each tool's latest run.
+
+    Arguments:
+        tools (list[str]): The tool names.
+        window (int): The number of earlier runs forming the baseline.
+        threshold (float): The ratio over baseline at which a metric is flagged.
+
+    Returns:
+        int: 1 if any regression was found, otherwise 0.
+    """
+    found = False
+
+    for tool in tools:
+        flagged = history.regressions(tool, window, threshold)
+        found = found or bool(flagged)
+
+        print(f"{tool}: {len(flagged)} regression(s)")
+        for regression in flagged:
+            print(f"    {regression}")
+
+    return 1 if found else 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Parses the command line and runs the requested command.
+
+    Arguments:
+        argv (Optional[list[str]]): The arguments, or None to use ``sys.argv``.
+
+    Returns:
+        int: The process exit code, 0 if every job succeeded or nothing regressed.
+    """
+    parser = argparse.ArgumentParser(
+        prog="colawater",
+        description="Run colawater toolbox tools without the ArcGIS Pro GUI.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the jobs in a JSON or TOML job file")
+    run.add_argument("job_file", type=Path)
+    run.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="maximum number of jobs to run at once (default: the job file's, or 1)",
+    )
+
+    report = commands.add_parser(
+        "report",
+        help="compare the latest run of each tool to a rolling baseline,"
+        " exiting with 1 if anything regressed",
+    )
+    report.add_argument("tools", nargs="*", metavar="TOOL", help="default: all tools")
+    report.add_argument(
+        "--window",
+        type=int,
+        default=5,
+        help="number of earlier runs forming the baseline (default: 5)",
+    )
+    report.add_argument(
+        "--threshold",
+        type=float,
+        default=1.5,
+        help="ratio over baseline at which a stage is flagged (default: 1.5)",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "report":
+        if unknown := set(args.tools) - set(TOOLS):
+            parser.error(
+                f"unknown tools {sorted(unknown)}, expected some of {sorted(TOOLS)}"
+            )
+
+        return report_regressions(
+            args.tools or list(TOOLS), args.window, args.threshold
+        )
+
+    try:
+        jobs, file_workers = load_jobs(args.job_file)
+    except (OSError, ValueError) as err:
+        parser.error(str(err))
+
+    return 0 if run_jobs(jobs, args.workers or file_workers or 1) else 1
@@ -18,10 +18,20 @@ Examples:
                 raise BaseException      # Uncaught, above Exception in the exception hierarchy
             
             return bar # This is returned normally
+
+        @fallible
+        @retrying()
+        def baz() -> None:
+            # Retried with backoff if the lock clears up, otherwise handled by fallible
+            raise RuntimeError("Cannot acquire a lock.")
 """
 
+import random
+import threading
+import time
+from collections import Counter
 from functools import wraps
-from typing import Any, Callable, NoReturn, TypeVar, Union
+from typing import Any, Callable, NoReturn, Optional, TypeVar, Union
 
 import arcpy
 
@@ -68,3 +78,154 @@ def fallible(f: Callable[..., _T]) -> Callable[..., Union[_T, NoReturn]]:
             return res
 
     return wrapper
+
+
+_TRANSIENT_MESSAGES: tuple[str, ...] = (
+    "cannot acquire a lock",
+    "failure to access the dbms server",
+    "network i/o error",
+    "connection aborted",
+    "connection reset",
+    "timed out",
+    "temporarily unavailable",
+)
+"""
+Lowercase fragments of error messages that usually clear up on their own.
+"""
+
+_TRANSIENT_TYPES: tuple[type[BaseException], ...] = (ConnectionError, TimeoutError)
+"""
+Exception types that usually clear up on their own.
+"""
+
+
+class RetryPolicy:
+    """
+    How many times, and how long, to retry transient errors.
+
+    Delays use full jitter: attempt ``n`` sleeps for a random duration between 0 and
+    ``min(max_delay, base_delay * 2**n)`` seconds.
+    Retrying stops after ``attempts`` total attempts or once the total time slept
+    would exceed ``budget`` seconds, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 5,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+        budget: float = 300.0,
+        transient_messages: tuple[str, ...] = _TRANSIENT_MESSAGES,
+        transient_types: tuple[type[BaseException], ...] = _TRANSIENT_TYPES,
+    ) -> None:
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.transient_messages = transient_messages
+        self.transient_types = transient_types
+
+    def is_transient(self, err: Exception) -> bool:
+        """
+        Returns whether an exception is worth retrying.
+
+        Arguments:
+            err (Exception): The exception to classify.
+
+        Returns:
+            bool: Whether ``err`` is of a transient type or has a transient message.
+        """
+        if isinstance(err, self.transient_types):
+            return True
+
+        msg = str(err).lower()
+
+        return any(fragment in msg for fragment in self.transient_messages)
+
+    def delay(self, attempt: int) -> float:
+        """
+        Returns the number of seconds to sleep before retrying.
+
+        Arguments:
+            attempt (int): The zero-based number of the attempt that failed.
+
+        Returns:
+            float: The jittered delay in seconds.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+retry_counts: Counter[str] = Counter()
+"""
+Number of retries made so far, keyed by the qualified name of the retried function.
+"""
+
+_retry_counts_lock = threading.Lock()
+
+
+def retrying(
+    policy: Optional[RetryPolicy] = None,
+) -> Callable[[Callable[..., _T]], Callable[..., _T]]:
+    """
+    Retries the decorated function with jittered exponential backoff on transient errors.
+
+    Non-transient errors, and transient errors once the policy is exhausted, are re-raised,
+    so this should be applied beneath ``fallible``.
+
+    Arguments:
+        policy (Optional[RetryPolicy]): The retry policy, or None for the default policy.
+
+    Returns:
+        Callable[[Callable[..., _T]], Callable[..., _T]]: The decorator.
+    """
+    pol = policy or RetryPolicy()
+
+    def decorator(f: Callable[..., _T]) -> Callable[..., _T]:
+        site = f"{f.__module__}.{f.__qualname__}"
+
+        @wraps(f)
+        def wrapper(*args: Any, **kwargs: Any) -> _T:
+            attempt = 0
+            slept = 0.0
+
+            while True:
+                try:
+                    return f(*args, **kwargs)
+                except Exception as err:
+                    delay = pol.delay(attempt)
+                    attempt += 1
+
+                    if (
+                        not pol.is_transient(err)
+                        or attempt >= pol.attempts
+                        or slept + delay > pol.budget
+                    ):
+                        raise
+
+                    with _retry_counts_lock:
+                        retry_counts[site] += 1
+
+                    arcpy.AddWarning(
+                        f"Transient error in {f.__name__}: {repr(err)}\n"
+                        f"Retrying in {delay:.1f}s (attempt {attempt + 1} of {pol.attempts})"
+                    )
+                    time.sleep(delay)
+                    slept += delay
+
+        return wrapper
+
+    return decorator
+
+
+def report_retries() -> None:
+    """
+    Adds a message with the retry count of each call site, then resets the counts.
+
+    Returns:
+        None
+    """
+    with _retry_counts_lock:
+        for site, count in sorted(retry_counts.items()):
+            arcpy.AddMessage(f"Retried {site} {count} time(s)")
+
+        retry_counts.clear()
@@ -0,0 +1,335 @@
+"""
+Local SQLite history of tool runs, used to spot runs that got slower or larger.
+
+Each run records metrics keyed by subject (a group or dataset), stage, and metric name.
+Samples are kept in memory while the tool runs and written in one transaction at the end,
+so recording from worker threads is cheap and never touches the database.
+
+Examples:
+    .. code-block:: python
+
+        with Recorder("UpdateAGOData") as run:
+            with run.stage("Water", "export"):
+                export()
+            run.record("Water", "export", "bytes", 123456)
+
+        for regression in regressions("UpdateAGOData"):
+            print(regression)
+"""
+
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import TracebackType
+from typing import Iterator, Optional
+
+import arcpy
+
+_HISTORY_PATH: Path = Path(
+    os.environ.get(
+        "COLAWATER_HISTORY",
+        Path(os.environ.get("LOCALAPPDATA", Path.home())) / "colawater" / "history.db",
+    )
+)
+"""
+Path to the history database, overridable with the ``COLAWATER_HISTORY`` environment variable.
+"""
+
+_MIN_DELTA: dict[str, float] = {
+    "seconds": 5.0,
+    "bytes": 1024.0 * 1024.0,
+    "rows": 1000.0,
+}
+"""
+Smallest absolute increase per metric worth flagging, so tiny values don't trip the ratio.
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    tool TEXT NOT NULL,
+    started REAL NOT NULL,
+    finished REAL NOT NULL,
+    ok INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    subject TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_tool ON runs (tool, started);
+"""
+
+
+def connect(path: Optional[Path] = None) -> sqlite3.Connection:
+    """
+    Opens the history database, creating it if needed.
+
+    Arguments:
+        path (Optional[Path]): The database path, or None for the default path.
+
+    Returns:
+        sqlite3.Connection: The open connection.
+    """
+    target = path or _HISTORY_PATH
+    target.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(target)
+    conn.executescript(_SCHEMA)
+
+    return conn
+
+
+class Recorder:
+    """
+    Collects the metrics of a single tool run and saves them on exit.
+
+    Failing to save only adds a warning; history must never fail the tool itself.
+    """
+
+    def __init__(self, tool: str, path: Optional[Path] = None) -> None:
+        self.tool = tool
+        self._path = path
+        self._samples: list[tuple[str, str, str, float]] = []
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+    def __enter__(self) -> "Recorder":
+        self._started = time.time()
+
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        try:
+            conn = connect(self._path)
+            try:
+                with conn:
+                    run_id = conn.execute(
+                        "INSERT INTO runs (tool, started, finished, ok) VALUES (?, ?, ?, ?)",
+                        (self.tool, self._started, time.time(), exc_type is None),
+                    ).lastrowid
+                    conn.executemany(
+                        "INSERT INTO metrics (run_id, subject, stage, metric, value)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        [(run_id, *sample) for sample in self._samples],
+                    )
+            finally:
+                conn.close()
+        except (OSError, sqlite3.Error) as err:
+            arcpy.AddWarning(f"Could not save run history: {repr(err)}")
+
+    def record(self, subject: str, stage: str, metric: str, value: float) -> None:
+        """
+        Records a single metric value.
+
+        Arguments:
+            subject (str): The group or dataset the value belongs to.
+            stage (str): The stage that produced the value.
+            metric (str): The metric name, e.g. ``seconds``, ``bytes``, or ``rows``.
+            value (float): The value.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._samples.append((subject, stage, metric, value))
+
+    def total(self, subject: str, stage: str, metric: str) -> Optional[float]:
+        """
+        Returns the sum of the values recorded so far for a metric.
+
+        Arguments:
+            subject (str): The group or dataset the values belong to.
+            stage (str): The stage that produced the values.
+            metric (str): The metric name.
+
+        Returns:
+            Optional[float]: The sum, or None if nothing was recorded.
+        """
+        with self._lock:
+            values = [
+                v
+                for s, st, m, v in self._samples
+                if (s, st, m) == (subject, stage, metric)
+            ]
+
+        return sum(values) if values else None
+
+    @contextmanager
+    def stage(self, subject: str, stage: str) -> Iterator[None]:
+        """
+        Records the wall time of the ``with`` block as the ``seconds`` metric.
+
+        Arguments:
+            subject (str): The group or dataset being processed.
+            stage (str): The stage name.
+
+        Returns:
+            Iterator[None]: The context manager.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(subject, stage, "seconds", time.perf_counter() - start)
+
+
+class Regression:
+    """
+    A metric whose latest value grew well beyond its baseline.
+    """
+
+    def __init__(
+        self,
+        subject: str,
+        stage: str,
+        metric: str,
+        latest: float,
+        baseline: float,
+    ) -> None:
+        self.subject = subject
+        self.stage = stage
+        self.metric = metric
+        self.latest = latest
+        self.baseline = baseline
+
+    def __str__(self) -> str:
+        ratio = self.latest / self.baseline if self.baseline else float("inf")
+
+        return (
+            f"{self.subject or '(all)'} {self.stage} {self.metric}:"
+            f" {self.latest:,.1f} vs baseline {self.baseline:,.1f} ({ratio:.2f}x)"
+        )
+
+
+def baseline(
+    tool: str,
+    subject: str,
+    stage: str,
+    metric: str,
+    window: int = 5,
+    unless: Optional[tuple[str, str]] = None,
+    path: Optional[Path] = None,
+) -> Optional[float]:
+    """
+    Returns the median of a metric over the latest successful runs of a tool that recorded it.
+
+    Arguments:
+        tool (str): The tool name.
+        subject (str): The group or dataset.
+        stage (str): The stage name.
+        metric (str): The metric name.
+        window (int): The number of runs to take the median over.
+        unless (Optional[tuple[str, str]]): A subject and stage; runs that recorded
+            that stage for that subject are left out, e.g. to compare against unoptimized runs.
+        path (Optional[Path]): The database path, or None for the default path.
+
+    Returns:
+        Optional[float]: The median, or None if no run qualifies.
+    """
+    query = (
+        "SELECT SUM(m.value) FROM metrics m JOIN runs r ON r.id = m.run_id"
+        " WHERE r.tool = ? AND r.ok AND m.subject = ? AND m.stage = ? AND m.metric = ?"
+    )
+    params: list[object] = [tool, subject, stage, metric]
+
+    if unless is not None:
+        query += (
+            " AND NOT EXISTS (SELECT 1 FROM metrics u"
+            " WHERE u.run_id = r.id AND u.subject = ? AND u.stage = ?)"
+        )
+        params.extend(unless)
+
+    query += " GROUP BY r.id ORDER BY r.started DESC, r.id DESC LIMIT ?"
+    params.append(window)
+
+    conn = connect(path)
+
+    try:
+        values = [row[0] for row in conn.execute(query, params)]
+    finally:
+        conn.close()
+
+    return statistics.median(values) if values else None
+
+
+def regressions(
+    tool: str,
+    window: int = 5,
+    threshold: float = 1.5,
+    path: Optional[Path] = None,
+) -> list[Regression]:
+    """
+    Compares the latest successful run of a tool against a rolling baseline.
+
+    The baseline of each metric is its median over the ``window`` successful runs before the latest.
+    A metric is flagged if it exceeds ``threshold`` times its baseline by more than a small
+    per-metric minimum.
+
+    Arguments:
+        tool (str): The tool name.
+        window (int): The number of earlier runs forming the baseline.
+        threshold (float): The ratio over baseline at which a metric is flagged.
+        path (Optional[Path]): The database path, or None for the default path.
+
+    Returns:
+        list[Regression]: The flagged metrics, worst ratio first.
+    """
+    conn = connect(path)
+
+    try:
+        run_ids = [
+            row[0]
+            for row in conn.execute(
+                "SELECT id FROM runs WHERE tool = ? AND ok ORDER BY started DESC, id DESC LIMIT ?",
+                (tool, window + 1),
+            )
+        ]
+
+        if len(run_ids) < 2:
+            return []
+
+        values: dict[tuple[str, str, str], dict[int, float]] = {}
+
+        for run_id, subject, stage, metric, value in conn.execute(
+            "SELECT run_id, subject, stage, metric, SUM(value) FROM metrics"
+            f" WHERE run_id IN ({', '.join('?' * len(run_ids))})"
+            " GROUP BY run_id, subject, stage, metric",
+            run_ids,
+        ):
+            values.setdefault((subject, stage, metric), {})[run_id] = value
+    finally:
+        conn.close()
+
+    latest_id, baseline_ids = run_ids[0], run_ids[1:]
+    flagged = []
+
+    for (subject, stage, metric), by_run in values.items():
+        history = [by_run[i] for i in baseline_ids if i in by_run]
+
+        if latest_id not in by_run or not history:
+            continue
+
+        latest = by_run[latest_id]
+        baseline = statistics.median(history)
+
+        if latest > baseline * threshold and latest - baseline > _MIN_DELTA.get(
+            metric, 0.0
+        ):
+            flagged.append(Regression(subject, stage, metric, latest, baseline))
+
+    return sorted(
+        flagged,
+        key=lambda r: r.latest / r.baseline if r.baseline else float("inf"),
+        reverse=True,
+    )
@@ -6,8 +6,11 @@ Examples:
     .. code-block:: python
 
         has_objectid = has_field(layer, "OBJECTID")
+        placeholders = count_rows(layer, "FACILITYID = 'ABC'")
 """
 
+import uuid
+
 import arcpy
 
 
@@ -30,3 +33,32 @@ def has_field(
         bool: Whether ``layer`` contains ``field_name``
     """
     return bool(arcpy.ListFields(layer, field_name))
+
+
+def count_rows(
+    layer: arcpy._mp.Layer,  # pyright: ignore [reportAttributeAccessIssue]
+    where_clause: str = "",
+) -> int:
+    """
+    Returns the number of rows in a layer, optionally only those matching a where clause.
+
+    The rows are counted by the database through ``GetCount``, on a temporary filtered view
+    if ``where_clause`` is given, so no rows are fetched.
+
+    Arguments:
+        layer (arcpy._mp.Layer): A layer object or the path to a dataset.
+        where_clause (str): The SQL where clause to filter rows with, or empty to count all rows.
+
+    Returns:
+        int: The number of matching rows.
+    """
+    if not where_clause:
+        return int(arcpy.management.GetCount(layer)[0])
+
+    view = f"colawater_count_{uuid.uuid4().hex}"
+    arcpy.management.MakeTableView(layer, view, where_clause)
+
+    try:
+        return int(arcpy.management.GetCount(view)[0])
+    finally:
+        arcpy.management.Delete(view)
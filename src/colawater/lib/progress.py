@@ -0,0 +1,133 @@
+"""
+Throttled progress reporting for long-running row loops.
+
+Updating the progressor on every row is slow enough to dominate a cursor loop,
+so the reporter only touches the progressor once a time or row threshold is crossed.
+
+Examples:
+    .. code-block:: python
+
+        with Progress("Updating rows", total) as progress:
+            for row in cursor:
+                ...
+                progress.step()
+"""
+
+import time
+from types import TracebackType
+from typing import Callable, Optional
+
+import arcpy
+
+_INTERVAL_SECONDS: float = 0.5
+"""
+Minimum number of seconds between progressor updates.
+"""
+
+_INTERVAL_ROWS: int = 5000
+"""
+Maximum number of rows between progressor updates.
+"""
+
+
+def _fmt_duration(seconds: float) -> str:
+    """
+    Formats a duration as ``H:MM:SS``.
+
+    Arguments:
+        seconds (float): The duration in seconds.
+
+    Returns:
+        str: The formatted duration.
+    """
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    return f"{hours}:{minutes:02}:{secs:02}"
+
+
+class Progress:
+    """
+    Reports row progress, throughput, and ETA to the geoprocessing progressor.
+
+    The progressor is updated when either ``interval_seconds`` have passed or
+    ``interval_rows`` rows have been stepped since the last update, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        label: str,
+        total: int,
+        interval_seconds: float = _INTERVAL_SECONDS,
+        interval_rows: int = _INTERVAL_ROWS,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.label = label
+        self.total = total
+        self.count = 0
+        self._interval_seconds = interval_seconds
+        self._interval_rows = interval_rows
+        self._clock = clock
+        self._start = clock()
+        self._next_count = interval_rows
+        self._next_time = self._start + interval_seconds
+
+    def __enter__(self) -> "Progress":
+        if self.total > 0:
+            arcpy.SetProgressor("step", self.label, 0, self.total, 1)
+        else:
+            arcpy.SetProgressor("default", self.label)
+
+        self._start = self._clock()
+        self._next_time = self._start + self._interval_seconds
+
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        arcpy.ResetProgressor()
+
+    def step(self, rows: int = 1) -> None:
+        """
+        Advances the row count, updating the progressor if a threshold was crossed.
+
+        Arguments:
+            rows (int): The number of rows processed since the last call.
+
+        Returns:
+            None
+        """
+        self.count += rows
+
+        if self.count >= self._next_count or self._clock() >= self._next_time:
+            self._report()
+
+    def _report(self) -> None:
+        """
+        Updates the progressor position and label, then schedules the next update.
+
+        Returns:
+            None
+        """
+        now = self._clock()
+        elapsed = now - self._start
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+
+        if self.total > 0 and rate > 0:
+            eta = _fmt_duration(max(self.total - self.count, 0) / rate)
+            arcpy.SetProgressorPosition(min(self.count, self.total))
+            arcpy.SetProgressorLabel(
+                f"{self.label}: {self.count}/{self.total} rows"
+                f" ({rate:.0f} rows/s, ETA {eta})"
+            )
+        else:
+            arcpy.SetProgressorLabel(
+                f"{self.label}: {self.count} rows ({rate:.0f} rows/s)"
+            )
+
+        self._next_count = self.count + self._interval_rows
+        self._next_time = now + self._interval_seconds
@@ -1,11 +1,17 @@
+import hashlib
+import json
+import os
+import tempfile
 from enum import Enum, unique
+from pathlib import Path
 from typing import Any, Optional
 
 import arcpy
 
 from colawater.lib import desc
 from colawater.lib import layer as ly
-from colawater.lib.error import fallible
+from colawater.lib.error import fallible, retrying
+from colawater.lib.progress import Progress
 
 
 @unique
@@ -44,29 +50,238 @@ class FacIDTemplate(Enum):
 assert AssetType._member_names_ == FacIDTemplate._member_names_
 
 
+_CHECKPOINT_DIR = Path(tempfile.gettempdir()) / "colawater_fids"
+"""
+Directory holding one checkpoint file per layer, asset type, and placeholder of chunked runs.
+"""
+
+
+class _Checkpoint:
+    """
+    The state of a chunked run: its inputs and the first counter value it has not issued.
+    """
+
+    def __init__(self, start: int, interval: int, counter: int) -> None:
+        self.start = start
+        self.interval = interval
+        self.counter = counter
+
+
+def _checkpoint_path(
+    layer: arcpy._mp.Layer,  # pyright: ignore [reportAttributeAccessIssue]
+    asset_type: AssetType,
+    placeholder: str,
+) -> Path:
+    """
+    Returns the checkpoint file path of a layer, asset type, and placeholder.
+
+    Arguments:
+        layer (arcpy._mp.Layer): The layer value.
+        asset_type (AssetType): The asset type.
+        placeholder (str): The placeholder being replaced.
+
+    Returns:
+        Path: The checkpoint file path, which may not exist.
+    """
+    key = f"{desc.full_path(layer)}|{asset_type.name}|{placeholder}"
+
+    return _CHECKPOINT_DIR / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+
+def _read_checkpoint(path: Path) -> Optional[_Checkpoint]:
+    """
+    Reads the checkpoint file at ``path``.
+
+    Arguments:
+        path (Path): The checkpoint file path.
+
+    Returns:
+        Optional[_Checkpoint]: The checkpoint, or None if there is no checkpoint file.
+
+    Raises:
+        ValueError: The checkpoint file exists but could not be read.
+    """
+    try:
+        return _Checkpoint(**json.loads(path.read_text()))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError) as err:
+        raise ValueError(f"Unreadable checkpoint {path}: {repr(err)}") from err
+
+
+def _write_checkpoint(path: Path, checkpoint: _Checkpoint) -> None:
+    """
+    Atomically replaces the checkpoint file at ``path``.
+
+    Each write goes through its own uniquely named temporary file,
+    so concurrent runs never clobber each other's partial writes.
+
+    Arguments:
+        path (Path): The checkpoint file path.
+        checkpoint (_Checkpoint): The checkpoint to write.
+
+    Returns:
+        None
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+
+    with os.fdopen(fd, "w") as f:
+        json.dump(vars(checkpoint), f)
+
+    os.replace(tmp, path)
+
+
+def _clear_checkpoint(path: Path) -> None:
+    """
+    Deletes the checkpoint file at ``path``, if any.
+
+    Arguments:
+        path (Path): The checkpoint file path.
+
+    Returns:
+        None
+    """
+    path.unlink(missing_ok=True)
+
+
+def _resume_counter(path: Path, basename: str, start: int, interval: int) -> int:
+    """
+    Returns the counter value a run should start from, honouring any checkpoint.
+
+    Rows committed by an earlier run no longer match the placeholder, so starting over
+    from ``start`` would reissue their identifiers.
+    A checkpoint left by a run with other inputs is therefore refused rather than discarded.
+
+    Arguments:
+        path (Path): The checkpoint file path.
+        basename (str): The layer name, for messages.
+        start (int): The start value of this run.
+        interval (int): The interval of this run.
+
+    Returns:
+        int: The checkpointed counter value, or ``start`` if there is no checkpoint.
+
+    Raises:
+        ValueError: The checkpoint is unreadable or was left by a run with other inputs.
+    """
+    checkpoint = _read_checkpoint(path)
+
+    if checkpoint is None:
+        return start
+
+    if (
+        checkpoint.start != start
+        or checkpoint.interval != interval
+        or checkpoint.counter < start
+    ):
+        raise ValueError(
+            f"[{basename}] has a checkpoint from an interrupted run with start value"
+            f" {checkpoint.start} and interval {checkpoint.interval}, which already issued"
+            f" identifiers up to {checkpoint.counter}. Rerun with that start value and"
+            f" interval to resume, or delete {path} once the layer has been checked."
+        )
+
+    arcpy.AddWarning(
+        f"Resuming [{basename}] from checkpoint {checkpoint.counter} instead of {start}"
+    )
+
+    return checkpoint.counter
+
+
+def _update_fids(
+    layer: arcpy._mp.Layer,  # pyright: ignore [reportAttributeAccessIssue]
+    facid_template: str,
+    where_facid: str,
+    interval: int,
+    counter: int,
+    progress: Progress,
+    limit: Optional[int] = None,
+) -> tuple[int, int]:
+    """
+    Replaces placeholder facility identifiers, stopping after ``limit`` rows if given.
+
+    Must be called inside an edit session.
+
+    Arguments:
+        layer (arcpy._mp.Layer): The layer value.
+        facid_template (str): The facility identifier format.
+        where_facid (str): The where clause selecting rows with the placeholder.
+        interval (int): The interval to increment the facility identifier.
+        counter (int): The first facility identifier value to issue.
+        progress (Progress): The progress reporter, stepped once per row.
+        limit (Optional[int]): The maximum number of rows to update, or None for all rows.
+
+    Returns:
+        tuple[int, int]: The number of rows updated and the next counter value.
+    """
+    fields = ("FACILITYID", "FACILITYIDINDEX")
+    updated = 0
+
+    if ly.has_field(layer, fields[1]):
+        with arcpy.da.UpdateCursor(  # pyright: ignore [reportAttributeAccessIssue]
+            layer,
+            fields,
+            where_facid,
+        ) as cursor:
+            for _ in cursor:
+                cursor.updateRow((facid_template.format(counter), counter))
+                counter += interval
+                updated += 1
+                progress.step()
+                if updated == limit:
+                    break
+    else:
+        with arcpy.da.UpdateCursor(  # pyright: ignore [reportAttributeAccessIssue]
+            layer,
+            fields[0],
+            where_facid,
+        ) as cursor:
+            for _ in cursor:
+                cursor.updateRow((facid_template.format(counter),))
+                counter += interval
+                updated += 1
+                progress.step()
+                if updated == limit:
+                    break
+
+    return updated, counter
+
+
 @fallible
+@retrying()
 def calculate_fids(
     layer: arcpy._mp.Layer,  # pyright: ignore [reportAttributeAccessIssue]
     asset_type: AssetType,
     placeholder: str,
     interval: int,
     start: int,
-) -> int:
+    chunk_size: Optional[int] = None,
+) -> tuple[int, int]:
     """
     Calculates and updates the facility identifiers for the provided layer.
     If the layer has a facility identifier index, also update that.
 
+    If ``chunk_size`` is given, every ``chunk_size`` rows are committed in their own
+    edit session and the next counter value is checkpointed to disk.
+    A later run with the same layer, asset type, placeholder, start, and interval resumes
+    from the checkpoint instead of ``start``, chunked or not, since committed rows
+    no longer match ``placeholder``.
+    A run with other inputs refuses to start while the checkpoint exists,
+    and a run that finishes clears it.
+
     Arguments:
         layer (arcpy._mp.Layer): The layer value.
         asset_type (AssetType): The asset type.
         placeholder (str): The placeholder to replace with the calculated facility identifiers.
         interval (int): The interval to increment the facility identifier.
         start (int): The start value.
+        chunk_size (Optional[int]): The number of rows to commit per edit session,
+            or None to update all rows in one edit session.
 
     Returns:
-        Optional[int]: The final facility identifier value, plus one interval to be used
-             as an input for the next tool execution, or None if no values
-             matching ``placeholder`` were found.
+        tuple[int, int]: The final facility identifier value, plus one interval to be used
+             as an input for the next tool execution, and the number of rows this call updated.
 
     Raises:
         ExecuteError: An error ocurred in the tool execution.
@@ -74,33 +289,62 @@ def calculate_fids(
     Note:
         Modifies input layer.
     """
-    counter = start
     facid_template = FacIDTemplate[asset_type.name].value
-    fields = ("FACILITYID", "FACILITYIDINDEX")
     workspace = desc.path(layer)
-    where_facid = f"{fields[0]} = '{placeholder}'"
-
-    with arcpy.da.Editor(workspace):  # pyright: ignore [reportAttributeAccessIssue]
-        if ly.has_field(layer, fields[1]):
-            with arcpy.da.UpdateCursor(  # pyright: ignore [reportAttributeAccessIssue]
-                layer,
-                fields,
-                where_facid,
-            ) as cursor:
-                for _ in cursor:
-                    cursor.updateRow((facid_template.format(counter), counter))
-                    counter += interval
-        else:
-            with arcpy.da.UpdateCursor(  # pyright: ignore [reportAttributeAccessIssue]
-                layer,
-                fields[0],
-                where_facid,
-            ) as cursor:
-                for _ in cursor:
-                    cursor.updateRow((facid_template.format(counter),))
-                    counter += interval
-
-    return counter
+    where_facid = f"FACILITYID = '{placeholder}'"
+    label = f"Updating {desc.basename(layer)}"
+
+    total = ly.count_rows(layer, where_facid)
+    checkpoint_path = _checkpoint_path(layer, asset_type, placeholder)
+    counter = _resume_counter(checkpoint_path, desc.basename(layer), start, interval)
+
+    if chunk_size is None:
+        # one edit session commits all or nothing, so there is nothing to checkpoint
+        with (
+            arcpy.da.Editor(workspace),  # pyright: ignore [reportAttributeAccessIssue]
+            Progress(label, total) as progress,
+        ):
+            updated, counter = _update_fids(
+                layer, facid_template, where_facid, interval, counter, progress
+            )
+
+        _clear_checkpoint(checkpoint_path)
+
+        return counter, updated
+
+    total_updated = 0
+
+    with Progress(label, total) as progress:
+        while True:
+            # record the end of the chunk before committing it, so a crash between the
+            # commit and the exact checkpoint below can only skip values, never reuse them
+            _write_checkpoint(
+                checkpoint_path,
+                _Checkpoint(start, interval, counter + chunk_size * interval),
+            )
+
+            with arcpy.da.Editor(  # pyright: ignore [reportAttributeAccessIssue]
+                workspace
+            ):
+                updated, counter = _update_fids(
+                    layer,
+                    facid_template,
+                    where_facid,
+                    interval,
+                    counter,
+                    progress,
+                    chunk_size,
+                )
+
+            total_updated += updated
+            _write_checkpoint(checkpoint_path, _Checkpoint(start, interval, counter))
+
+            if updated < chunk_size:
+                break
+
+    _clear_checkpoint(checkpoint_path)
+
+    return counter, total_updated
 
 
 def guess_asset_type(asset_str: str) -> Optional[str]:
@@ -3,13 +3,15 @@ Calculate Facility Identifiers
 """
 
 from getpass import getuser
-from typing import Any
+from typing import Any, Optional
 
 import arcpy
 import arcpy.management
 
 import colawater.lib.layer as ly
 from colawater.lib import desc
+from colawater.lib.error import report_retries
+from colawater.lib.history import Recorder
 
 from .lib import AssetType, calculate_fids, guess_asset_type
 
@@ -28,28 +30,40 @@ class CalculateFacilityIdentifiers:
                 int,
             ]
         ] = parameters[2].values
+        chunk_size: Optional[int] = parameters[3].value
 
         arcpy.AddMessage("Layer -> Next starting value\n")
 
-        for layer, asset_type, start in value_table:
-            basename = desc.basename(layer)
-
-            if start is None:
-                arcpy.AddWarning(f"Start value omitted: skipping [{basename}]")
-                continue
-
-            if not ly.has_field(layer, "FACILITYID"):
-                arcpy.AddWarning(f"Missing field 'FACILITYID': skipping [{basename}]")
-
-            new_fid = calculate_fids(
-                layer,
-                AssetType(asset_type),
-                placeholder,
-                interval,
-                start,
-            )
-
-            arcpy.AddMessage(f"{basename} -> {new_fid}")
+        try:
+            with Recorder(type(self).__name__) as run:
+                for layer, asset_type, start in value_table:
+                    basename = desc.basename(layer)
+
+                    if start is None:
+                        arcpy.AddWarning(f"Start value omitted: skipping [{basename}]")
+                        continue
+
+                    if not ly.has_field(layer, "FACILITYID"):
+                        arcpy.AddWarning(
+                            f"Missing field 'FACILITYID': skipping [{basename}]"
+                        )
+
+                    with run.stage(basename, "calculate_fids"):
+                        new_fid, updated = calculate_fids(
+                            layer,
+                            AssetType(asset_type),
+                            placeholder,
+                            interval,
+                            start,
+                            chunk_size,
+                        )
+
+                    run.record(basename, "calculate_fids", "rows", updated)
+
+                    arcpy.AddMessage(f"{basename} -> {new_fid}")
+        finally:
+            # retries leading up to a failure are the ones most worth seeing
+            report_retries()
 
     def getParameterInfo(self) -> list[arcpy.Parameter]:
         placeholder = arcpy.Parameter(
@@ -86,7 +100,17 @@ class CalculateFacilityIdentifiers:
         inputs.filters[1].type = "ValueList"
         inputs.filters[1].list = [variant.value for variant in AssetType]
 
-        return [placeholder, interval, inputs]
+        chunk_size = arcpy.Parameter(
+            displayName="Commit Interval",
+            name="chunk_size",
+            datatype="GPLong",
+            parameterType="Optional",
+            direction="Input",
+        )
+        chunk_size.filter.type = "Range"
+        chunk_size.filter.list = [1, 2**31 - 1]
+
+        return [placeholder, interval, inputs, chunk_size]
 
     def updateParameters(
         self, parameters: list[arcpy.Parameter]
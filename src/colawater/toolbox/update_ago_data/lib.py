@@ -1,14 +1,36 @@
+import shutil
+import tempfile
+import threading
+import time
+from multiprocessing.pool import ThreadPool
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Optional
 from zipfile import ZipFile
 
 import arcpy
-from arcgis.gis import ItemProperties, ItemTypeEnum
+from arcgis.gis import GIS, ItemProperties, ItemTypeEnum
 
-from colawater.lib.error import fallible
+from colawater.lib import layer as ly
+from colawater.lib.error import fallible, retrying
+from colawater.lib.history import Recorder
 
 _SPATIAL_REFERENCE = "3361"
 
+_TILE_COUNT = 8
+"""
+Number of object id ranges a large feature class is split into for a tiled export.
+"""
+
+_TILE_WORKERS = 4
+"""
+Maximum number of tiles of one feature class exported at once, bounding memory and connections.
+"""
+
+_PUBLISH_WAIT_SECONDS = 1800.0
+"""
+Maximum number of seconds to wait for uploaded geodatabases to show up in a portal's search.
+"""
+
 
 class LayerTablePair:
     """
@@ -167,7 +189,439 @@ water: LayerTablePair = LayerTablePair(
 )
 
 
+class ExportProfile:
+    """
+    Reductions applied to a staged dataset to make it lighter to publish.
+
+    The resolution and tolerance are numbers in the units of ``_SPATIAL_REFERENCE`` (feet),
+    the simplification tolerance is a linear unit string, e.g. ``"0.5 Feet"``.
+    """
+
+    def __init__(
+        self,
+        xy_resolution: Optional[float] = None,
+        xy_tolerance: Optional[float] = None,
+        simplify_tolerance: Optional[str] = None,
+        drop_zm: bool = False,
+    ) -> None:
+        self.xy_resolution = xy_resolution
+        self.xy_tolerance = xy_tolerance
+        self.simplify_tolerance = simplify_tolerance
+        self.drop_zm = drop_zm
+
+
+_web_lines_polygons = ExportProfile(0.01, 0.02, "1 Feet", True)
+_web_networks = ExportProfile(0.01, 0.02, "0.5 Feet", True)
+_web_points = ExportProfile(0.01, 0.02, None, True)
+
+publish_profiles: dict[str, ExportProfile] = {
+    "SDE.Boundary\\SDE.COUNTY": _web_lines_polygons,
+    "SDE.Boundary\\SDE.NEIGHBORHOOD": _web_lines_polygons,
+    "SDE.Boundary\\SDE.ZIP_CODE": _web_lines_polygons,
+    "SDE.LandRecords\\SDE.ADDRESS_POINT": _web_points,
+    "SDE.LandRecords\\SDE.PARCEL": _web_lines_polygons,
+    "SDE.NHDHydrology\\SDE.NHD_FLOWLINE": _web_lines_polygons,
+    "SDE.NHDHydrology\\SDE.WATER_BODY": _web_lines_polygons,
+    "SDE.Transportation\\SDE.STREETS": _web_lines_polygons,
+    "SDE.Sewer\\SDE.ssGravityMain": _web_networks,
+    "SDE.Sewer\\SDE.ssLateralLine": _web_networks,
+    "SDE.WaterNetwork\\SDE.waServiceLine": _web_networks,
+    "SDE.WaterNetwork\\SDE.waWaterMain": _web_networks,
+}
+"""
+Export profiles applied when optimizing for publishing, keyed by source dataset.
+Datasets without a profile are published at full precision.
+"""
+
+
+def staged_name(dataset: str) -> str:
+    """
+    Returns the name a source dataset is given when copied into a file geodatabase.
+
+    Arguments:
+        dataset (str): The source dataset, e.g. ``SDE.LandRecords\\SDE.PARCEL``.
+
+    Returns:
+        str: The unqualified name, e.g. ``PARCEL``.
+    """
+    return dataset.split("\\")[-1].split(".")[-1]
+
+
+def _rebuild_blockers(fc: str) -> list[str]:
+    """
+    Returns the geodatabase behaviour of a feature class that a rebuild can't carry over.
+
+    Arguments:
+        fc (str): The path to the feature class.
+
+    Returns:
+        list[str]: Descriptions of the behaviour that would be lost, empty if none.
+    """
+    d = arcpy.Describe(fc)  # pyright: ignore [reportAttributeAccessIssue]
+    blockers = []
+
+    if getattr(d, "relationshipClassNames", []):
+        blockers.append("relationship classes or attachments")
+    if getattr(d, "attributeRules", []):
+        blockers.append("attribute rules")
+
+    return blockers
+
+
+def _copy_behaviour(source: str, target: str) -> None:
+    """
+    Copies the alias, field aliases, domains, defaults, and subtypes of one feature class
+    onto another with the same fields.
+
+    ``CreateFeatureclass`` only takes the field definitions from its template,
+    so these would otherwise be lost and the published layers would show raw codes.
+
+    Arguments:
+        source (str): The path to the feature class to copy from.
+        target (str): The path to the feature class to copy to.
+
+    Returns:
+        None
+    """
+    alias = arcpy.Describe(  # pyright: ignore [reportAttributeAccessIssue]
+        source
+    ).aliasName
+    arcpy.management.AlterAliasName(target, alias)
+
+    target_fields = {f.name.upper(): f for f in arcpy.ListFields(target)}
+
+    for field in arcpy.ListFields(source):
+        copy = target_fields.get(field.name.upper())
+
+        if copy is None or not field.editable:
+            continue
+        if copy.aliasName != field.aliasName:
+            arcpy.management.AlterField(
+                target, field.name, new_field_alias=field.aliasName
+            )
+        if field.domain:
+            arcpy.management.AssignDomainToField(target, field.name, field.domain)
+        if field.defaultValue is not None:
+            arcpy.management.AssignDefaultToField(
+                target, field.name, field.defaultValue
+            )
+
+    subtypes: dict[int, dict[str, Any]] = arcpy.da.ListSubtypes(
+        source
+    )  # pyright: ignore [reportAttributeAccessIssue]
+    subtype_field = next(iter(subtypes.values()), {}).get("SubtypeField", "")
+
+    if not subtype_field:
+        return
+
+    arcpy.management.SetSubtypeField(target, subtype_field)
+
+    for code, subtype in subtypes.items():
+        arcpy.management.AddSubtype(target, code, subtype["Name"])
+        if subtype["Default"]:
+            arcpy.management.SetDefaultSubtype(target, code)
+
+        for name, (default, domain) in subtype["FieldValues"].items():
+            if domain is not None:
+                arcpy.management.AssignDomainToField(
+                    target, name, domain.name, [f"{code}: {subtype['Name']}"]
+                )
+            if default is not None:
+                arcpy.management.AssignDefaultToField(
+                    target, name, default, [f"{code}: {subtype['Name']}"]
+                )
+
+
 @fallible
+def apply_profile(gdb: str, dataset: str, profile: ExportProfile) -> None:
+    """
+    Applies an export profile in place to a dataset staged in a geodatabase.
+
+    Lines and polygons are simplified first, then the dataset is appended into a new
+    feature class whose spatial reference and z/m flags carry the profile's settings,
+    and the new feature class replaces the original.
+    The settings live on the output rather than in ``arcpy.env``, which is shared by every
+    thread, so concurrent calls can't reset each other's precision.
+
+    The rebuilt feature class keeps the alias, field aliases, domains, defaults, and subtypes
+    of the original.
+    Relationship classes, attachments, and attribute rules can't be carried over, so datasets
+    with any of them are only simplified, with a warning, and keep their full precision.
+    Indexes other than the spatial index and editor tracking settings are not carried over,
+    which doesn't matter for the hosted layers they are published as.
+
+    Arguments:
+        gdb (str): The path to the staging gdb.
+        dataset (str): The source dataset name.
+        profile (ExportProfile): The profile to apply.
+
+    Returns:
+        None
+
+    Note:
+        Modifies the staged dataset.
+    """
+    fc = f"{gdb}\\{staged_name(dataset)}"
+    shape_type = arcpy.Describe(  # pyright: ignore [reportAttributeAccessIssue]
+        fc
+    ).shapeType
+
+    if profile.simplify_tolerance is not None and shape_type in ("Polyline", "Polygon"):
+        arcpy.edit.Generalize(fc, profile.simplify_tolerance)
+
+    if (
+        profile.xy_resolution is None
+        and profile.xy_tolerance is None
+        and not profile.drop_zm
+    ):
+        return
+
+    if blockers := _rebuild_blockers(fc):
+        arcpy.AddWarning(
+            f"{dataset}: keeping full precision, rebuilding would lose its"
+            f" {' and '.join(blockers)}"
+        )
+        return
+
+    spatial_reference = arcpy.Describe(  # pyright: ignore [reportAttributeAccessIssue]
+        fc
+    ).spatialReference
+    if profile.xy_resolution is not None:
+        spatial_reference.XYResolution = profile.xy_resolution
+    if profile.xy_tolerance is not None:
+        spatial_reference.XYTolerance = profile.xy_tolerance
+
+    zm = "DISABLED" if profile.drop_zm else "SAME_AS_TEMPLATE"
+    tmp = f"{staged_name(dataset)}_profiled"
+
+    arcpy.management.CreateFeatureclass(
+        gdb,
+        tmp,
+        shape_type.upper(),
+        template=fc,
+        has_m=zm,
+        has_z=zm,
+        spatial_reference=spatial_reference,
+    )
+    _copy_behaviour(fc, f"{gdb}\\{tmp}")
+    arcpy.management.Append(fc, f"{gdb}\\{tmp}", "NO_TEST")
+    arcpy.management.Delete(fc)
+    arcpy.management.Rename(f"{gdb}\\{tmp}", fc)
+
+
+def _schema(dataset: str) -> list[tuple[Any, ...]]:
+    """
+    Returns the comparable schema of a dataset: its fields and subtypes, ordered by name.
+
+    Fields are compared by name, type, length, alias, nullability, and domain,
+    subtypes by code, name, subtype field, default flag, and the domain of each field.
+    The object id, geometry, and geometry-derived length/area fields are left out,
+    since their names depend on the workspace rather than the data.
+
+    Arguments:
+        dataset (str): The path to the dataset.
+
+    Returns:
+        list[tuple[Any, ...]]: A tuple per field, then a tuple per subtype.
+    """
+    d = arcpy.Describe(dataset)  # pyright: ignore [reportAttributeAccessIssue]
+    derived = {
+        getattr(d, "lengthFieldName", "").upper(),
+        getattr(d, "areaFieldName", "").upper(),
+    }
+    fields = sorted(
+        (
+            "field",
+            f.name.upper(),
+            f.type,
+            f.length,
+            f.aliasName,
+            f.isNullable,
+            f.domain or "",
+        )
+        for f in arcpy.ListFields(dataset)
+        if f.type not in ("OID", "Geometry") and f.name.upper() not in derived
+    )
+    subtypes: dict[int, dict[str, Any]] = arcpy.da.ListSubtypes(
+        dataset
+    )  # pyright: ignore [reportAttributeAccessIssue]
+
+    return fields + sorted(
+        (
+            "subtype",
+            code,
+            subtype["Name"],
+            subtype["SubtypeField"].upper(),
+            subtype["Default"],
+            tuple(
+                sorted(
+                    (name.upper(), domain.name if domain is not None else "")
+                    for name, (_, domain) in subtype["FieldValues"].items()
+                )
+            ),
+        )
+        for code, subtype in subtypes.items()
+        if subtype["SubtypeField"]
+    )
+
+
+def _oid_range(dataset: str) -> tuple[int, int]:
+    """
+    Returns the smallest and largest object id in a dataset.
+
+    Arguments:
+        dataset (str): The path to the dataset.
+
+    Returns:
+        tuple[int, int]: The smallest and largest object id.
+    """
+    oid = arcpy.Describe(  # pyright: ignore [reportAttributeAccessIssue]
+        dataset
+    ).OIDFieldName
+    stats = f"memory\\oid_range_{threading.get_ident()}"
+
+    arcpy.analysis.Statistics(dataset, stats, [[oid, "MIN"], [oid, "MAX"]])
+    try:
+        with arcpy.da.SearchCursor(  # pyright: ignore [reportAttributeAccessIssue]
+            stats, [f"MIN_{oid}", f"MAX_{oid}"]
+        ) as cursor:
+            lo, hi = next(cursor)
+    finally:
+        arcpy.management.Delete(stats)
+
+    return int(lo), int(hi)
+
+
+@fallible
+def export_tiled(
+    workspace: str,
+    dataset: str,
+    gdb: str,
+    scratch_dir: str,
+    tiles: int = _TILE_COUNT,
+    workers: int = _TILE_WORKERS,
+) -> None:
+    """
+    Copies a large feature class into a geodatabase as concurrently exported object id ranges.
+
+    The first tile is exported straight into ``gdb`` so the result has the same schema as a
+    serial copy, the rest are exported into their own scratch geodatabases at most ``workers``
+    at a time, then appended in object id order.
+    The tile geodatabases live in a directory of their own under ``scratch_dir``,
+    so concurrent calls for the same dataset never share them.
+
+    The copy is verified against the source afterwards: its schema must match, and its row
+    count must match the rows the tiles read from the source's object id range when the
+    export began.
+    The source is live, so that count may fall short of the range's count at the start by
+    rows deleted during the export, which only adds a warning.
+    Rows inserted during the export get higher object ids, so they are left out with a warning.
+
+    Arguments:
+        workspace (str): The path to the source workspace.
+        dataset (str): The source dataset name.
+        gdb (str): The path to the target gdb.
+        scratch_dir (str): The directory to hold the tile gdbs.
+        tiles (int): The number of object id ranges to split the dataset into.
+        workers (int): The maximum number of tiles to export at once.
+
+    Returns:
+        None
+
+    Raises:
+        ExecuteError: The export failed or the copy doesn't match the source.
+    """
+    source = f"{workspace}\\{dataset}"
+    name = staged_name(dataset)
+    target = f"{gdb}\\{name}"
+    oid = arcpy.Describe(  # pyright: ignore [reportAttributeAccessIssue]
+        source
+    ).OIDFieldName
+
+    # the source is live, so the tiles and the expected count share one object id snapshot
+    lo, hi = _oid_range(source)
+    snapshot = f"{oid} >= {lo} AND {oid} <= {hi}"
+    expected = ly.count_rows(source, snapshot)
+    size = -(-(hi - lo + 1) // tiles)
+    wheres = [
+        f"{oid} >= {start} AND {oid} <= {min(start + size - 1, hi)}"
+        for start in range(lo, hi + 1, size)
+    ]
+    tile_dir = tempfile.mkdtemp(prefix=f"{name}_", dir=scratch_dir)
+    tile_names = [f"tile{i}" for i in range(1, len(wheres))]
+    outputs = [target] + [f"{tile_dir}\\{t}.gdb\\{name}" for t in tile_names]
+
+    try:
+        with ThreadPool(workers) as pool:
+            pool.starmap(
+                arcpy.management.CreateFileGDB,
+                [(tile_dir, tile_name) for tile_name in tile_names],
+            )
+            pool.starmap(
+                arcpy.conversion.ExportFeatures,
+                [(source, output, where) for output, where in zip(outputs, wheres)],
+            )
+
+        read = sum(ly.count_rows(output) for output in outputs)
+
+        if tile_names:
+            arcpy.management.Append(outputs[1:], target, "NO_TEST")
+    finally:
+        for tile_name in tile_names:
+            arcpy.management.Delete(f"{tile_dir}\\{tile_name}.gdb")
+        shutil.rmtree(tile_dir, ignore_errors=True)
+
+    if (actual := ly.count_rows(target)) != read:
+        raise ValueError(
+            f"Tiled copy of {dataset} has {actual} rows, but its tiles read {read}"
+        )
+
+    # rows can only leave the snapshot range, so the copy may fall short of the
+    # count at the start by at most the rows deleted since
+    remaining = ly.count_rows(source, snapshot)
+    if not min(remaining, expected) <= actual <= expected:
+        raise ValueError(
+            f"Tiled copy of {dataset} has {actual} rows, expected {expected}"
+            f" ({remaining} left in the source)"
+        )
+    if actual < expected:
+        arcpy.AddWarning(
+            f"{dataset}: {expected - actual} row(s) deleted during the export were left out"
+        )
+
+    if late := ly.count_rows(source, f"{oid} > {hi}"):
+        arcpy.AddWarning(
+            f"{dataset}: {late} row(s) inserted during the export were left out"
+        )
+
+    source_schema, target_schema = _schema(source), _schema(target)
+    if source_schema != target_schema:
+        differences = sorted(set(source_schema) ^ set(target_schema), key=str)
+        raise ValueError(
+            f"Tiled copy of {dataset} doesn't match the source schema: {differences}"
+        )
+
+
+def size_of(path: str) -> int:
+    """
+    Returns the size of a file, or the total size of the files in a directory.
+
+    Arguments:
+        path (str): The path to the file or directory, e.g. a gdb or zip.
+
+    Returns:
+        int: The size in bytes.
+    """
+    target = Path(path)
+
+    if target.is_file():
+        return target.stat().st_size
+
+    return sum(p.stat().st_size for p in target.rglob("*") if p.is_file())
+
+
+@fallible
+@retrying()
 def gdb_to_zip(gdb: str) -> None:
     """
     Zips a geodatabase in the same directory as the geodatabase.
@@ -195,6 +649,7 @@ def gdb_to_zip(gdb: str) -> None:
 
 
 @fallible
+@retrying()
 def upload_gdb(folder: Any, gdb: Any, title: str, tags: list[str]) -> None:
     """
     Uploads a geodatabase to a folder with a given title and tags.
@@ -207,7 +662,19 @@ def upload_gdb(folder: Any, gdb: Any, title: str, tags: list[str]) -> None:
 
     Returns:
         None
+
+    Note:
+        Items in ``folder`` with the same title and tags are deleted first, because a
+        retried upload may follow one that timed out after the portal created the item.
     """
+    for item in folder.list():
+        if (
+            item.type == ItemTypeEnum.FILE_GEODATABASE.value
+            and item.title == title
+            and set(tags) <= set(item.tags)
+        ):
+            item.delete()
+
     item_properties = ItemProperties(
         title=title,
         item_type=ItemTypeEnum.FILE_GEODATABASE.value,
@@ -222,6 +689,7 @@ def upload_gdb(folder: Any, gdb: Any, title: str, tags: list[str]) -> None:
 
 
 @fallible
+@retrying()
 def publish_gdb(remote_gdb: Any) -> None:
     """
     Publishes a remote gdb as a feature class service.
@@ -244,3 +712,147 @@ def publish_gdb(remote_gdb: Any) -> None:
         file_type="filegeodatabase",
         overwrite=True,
     )
+
+
+class PortalSessions:
+    """
+    Authenticated portal sessions, one per portal and credential profile,
+    shared by every thread of a single tool run.
+
+    Create one per run; toolbox modules stay loaded between runs in ArcGIS Pro,
+    so a longer-lived cache would keep reusing expired sessions.
+    Connecting to one portal never waits on a connection to another.
+    """
+
+    def __init__(self, connect: Callable[..., Any] = GIS) -> None:
+        self._connect = connect
+        self._sessions: dict[tuple[str, Optional[str]], Any] = {}
+        self._locks: dict[tuple[str, Optional[str]], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str, profile: Optional[str] = None) -> Any:
+        """
+        Returns the session for a portal, connecting on first use.
+
+        Arguments:
+            url (str): The portal URL or connection string passed to ``connect``.
+            profile (Optional[str]): The name of the stored arcgis credential profile
+                to sign in with, or None to use the active ArcGIS Pro portal sign-in.
+
+        Returns:
+            Any: The portal session.
+        """
+        key = (url, profile)
+
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            if key not in self._sessions:
+                self._sessions[key] = self._connect(url, profile=profile)
+
+            return self._sessions[key]
+
+
+def publish_to_portal(
+    portal: Any,
+    label: str,
+    gdbs_zipped: list[str],
+    titles: list[str],
+    tag: str,
+    workers: int,
+    run: Recorder,
+    poll_seconds: float = 1.0,
+    timeout_seconds: float = _PUBLISH_WAIT_SECONDS,
+) -> None:
+    """
+    Replaces the tagged geodatabases on a portal with freshly zipped ones and publishes them.
+
+    Uploads and publishes run on a pool of ``workers`` threads owned by this portal,
+    so a slow portal only ever holds up its own work.
+
+    Arguments:
+        portal (Any): The portal session, e.g. from ``PortalSessions.get``.
+        label (str): The name to use for this portal in messages and run history.
+        gdbs_zipped (list[str]): The paths to the zipped gdbs.
+        titles (list[str]): The item titles, in the same order as ``gdbs_zipped``.
+        tag (str): The tag and folder name identifying the managed items.
+        workers (int): The maximum number of concurrent uploads or publishes.
+        run (Recorder): The run history recorder.
+        poll_seconds (float): The delay between checks for uploaded items.
+        timeout_seconds (float): The maximum time to wait for uploaded items to show up.
+
+    Returns:
+        None
+
+    Raises:
+        TimeoutError: Some uploaded items didn't show up within ``timeout_seconds``.
+    """
+    try:
+        # raises a custom FolderException that isn't exposed anywhere
+        # if folder exists
+        folder = portal.content.folders.create(tag)
+    except Exception:
+        folder = portal.content.folders.get(tag)
+
+    def _search() -> list[Any]:
+        items: list[Any] = portal.content.search(
+            query="", item_type="File Geodatabase", filter=f"tags:{tag}"
+        )
+
+        return items
+
+    def _latest_by_title() -> dict[str, Any]:
+        latest: dict[str, Any] = {}
+
+        for gdb in _search():
+            if gdb.title not in latest or gdb.created > latest[gdb.title].created:
+                latest[gdb.title] = gdb
+
+        return latest
+
+    def _upload(title: str, gdb_zipped: str) -> None:
+        start = time.perf_counter()
+        with run.stage(f"{title} @ {label}", "upload"):
+            upload_gdb(folder, gdb_zipped, title, [tag])
+
+        run.record(f"{title} @ {label}", "upload", "bytes", size_of(gdb_zipped))
+        arcpy.AddMessage(
+            f"{title}: uploaded to {label} in {time.perf_counter() - start:.1f}s"
+        )
+
+    def _publish(remote_gdb: Any) -> None:
+        with run.stage(f"{remote_gdb.title} @ {label}", "publish"):
+            publish_gdb(remote_gdb)
+
+    with ThreadPool(workers) as pool:
+        arcpy.AddMessage(f"{label}: removing remote geodatabases...")
+        with run.stage(label, "delete"):
+            # no need for mp, this takes like 2 seconds
+            for gdb in _search():
+                gdb.delete()
+
+        arcpy.AddMessage(f"{label}: uploading geodatabases...")
+        pool.starmap(_upload, zip(titles, gdbs_zipped))
+
+        arcpy.AddMessage(f"{label}: waiting for publishing availability...")
+        with run.stage(label, "wait"):
+            deadline = time.monotonic() + timeout_seconds
+
+            while len(latest := _latest_by_title()) < len(titles):
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(
+                        f"{label}: {sorted(set(titles) - set(latest))} not available"
+                        f" {timeout_seconds:.0f}s after uploading"
+                    )
+
+                time.sleep(poll_seconds)
+
+        # never publish two items under the same service name at once
+        keep = {gdb.id for gdb in latest.values()}
+        for gdb in _search():
+            if gdb.id not in keep:
+                gdb.delete()
+
+        arcpy.AddMessage(f"{label}: publishing feature layers...")
+        pool.map(_publish, latest.values())
@@ -1,12 +1,14 @@
 import tempfile
 import time
 from multiprocessing.pool import ThreadPool
-from typing import Any, Callable
+from typing import Any, Optional
 
-import arcgis
 import arcpy
 
+import colawater.lib.layer as ly
 from colawater.lib import desc
+from colawater.lib.error import report_retries
+from colawater.lib.history import Recorder, baseline
 
 from .lib import *
 
@@ -20,14 +22,10 @@ class UpdateAGOData:
 
     def execute(self, parameters: list[arcpy.Parameter], messages: list[Any]) -> None:
         conn_aspen = desc.full_path(parameters[0].value)
-        conn_portal = arcgis.GIS(parameters[1].valueAsText)
+        targets: list[tuple[str, Optional[int], Optional[str]]] = parameters[1].values
+        optimize: bool = bool(parameters[2].value)
+        tile_threshold: Optional[int] = parameters[3].value
         tag = "auto_weekly_data"
-        try:
-            # raises a custom FolderException that isn't exposed anywhere
-            # if folder exists
-            folder = conn_portal.content.folders.create(tag)
-        except Exception:
-            folder = conn_portal.content.folders.get(tag)
         fcs = [
             base_data,
             infrastructure,
@@ -43,84 +41,178 @@ class UpdateAGOData:
             arcpy.AddMessage(msg)
             arcpy.SetProgressorLabel(msg)
 
-        with (
-            ThreadPool(steps) as pool,
-            tempfile.TemporaryDirectory() as tmp_dir,
-        ):
-            arcpy.SetProgressor("step", min_range=0, max_range=steps, step_value=1)
-
-            def _env(f: Callable) -> Callable:
-                def wrapper(*args, **kwargs):
-                    with arcpy.EnvManager(
-                        workspace=conn_aspen,
-                        transferGDBAttributeProperties=True,
+        try:
+            with (
+                Recorder(type(self).__name__) as run,
+                ThreadPool(steps) as pool,
+                tempfile.TemporaryDirectory() as tmp_dir,
+            ):
+                arcpy.SetProgressor("step", min_range=0, max_range=steps, step_value=1)
+
+                def _export(group: LayerTablePair, gdb: str) -> None:
+                    with (
+                        run.stage(group.name, "export"),
+                        arcpy.EnvManager(
+                            workspace=conn_aspen,
+                            transferGDBAttributeProperties=True,
+                        ),
                     ):
-                        f(*args, **kwargs)
-
-                return wrapper
-
-            _prog_helper("Downloading data...")
-            pool.starmap(
-                arcpy.management.CreateFileGDB,
-                [
-                    [tmp_dir for _ in range(steps)],
-                    titles,
-                ],
-            )
-
-            gdbs = [f"{tmp_dir}\\{title}.gdb" for title in titles]
-
-            pool.starmap(
-                _env(arcpy.conversion.FeatureClassToGeodatabase),
-                [
-                    fcs[:-1],
-                    gdbs[:-1],
-                ],
-            )
-            _env(
-                arcpy.conversion.TableToGeodatabase
-            )(  # pyright: ignore [reportAttributeAccessIssue]
-                gdbs[-1], f"{tmp_dir}\\Tables.gdb"
-            )
-
-            _prog_helper("Compressing geodatabases...")
-            pool.starmap(gdb_to_zip, gdbs)
-
-            _prog_helper("Removing remote geodatabases...")
-            gdbs_remote = conn_portal.content.search(
-                query=f"", item_type="File Geodatabase", filter=f"tags:{tag}"
-            )
-            # no need for mp, this takes like 2 seconds
-            for gdb in gdbs_remote:
-                gdb.delete()
-
-            _prog_helper("Uploading geodatabases...")
-            gdbs_zipped = [f"{tmp_dir}\\{title}.zip" for title in titles]
-            pool.starmap(
-                upload_gdb,
-                [
-                    [folder for _ in range(steps)],
-                    gdbs_zipped,
-                    titles,
-                    [[tag] for _ in range(steps)],
-                ],
-            )
-
-            _prog_helper("Waiting for publishing availability...")
-            while (
-                len(
-                    gdbs_remote := conn_portal.content.search(
-                        query=f"",
-                        item_type="File Geodatabase",
-                        filter=f"tags:{tag}",
+                        tiled = [
+                            fc
+                            for fc in group.feature_classes
+                            if tile_threshold is not None
+                            and ly.count_rows(f"{conn_aspen}\\{fc}") >= tile_threshold
+                        ]
+                        serial = [fc for fc in group.feature_classes if fc not in tiled]
+
+                        if serial:
+                            arcpy.conversion.FeatureClassToGeodatabase(serial, gdb)
+                        for fc in tiled:
+                            arcpy.AddMessage(
+                                f"{group.name}: exporting {fc} in tiles..."
+                            )
+                            with run.stage(fc, "export_tiled"):
+                                export_tiled(conn_aspen, fc, gdb, tmp_dir)
+                        if group.tables:
+                            arcpy.conversion.TableToGeodatabase(  # pyright: ignore [reportAttributeAccessIssue]
+                                group.tables, gdb
+                            )
+
+                    run.record(group.name, "export", "bytes", size_of(gdb))
+
+                def _optimize(group: LayerTablePair, gdb: str) -> None:
+                    profiles = [
+                        (fc, publish_profiles[fc])
+                        for fc in group.feature_classes
+                        if fc in publish_profiles
+                    ]
+
+                    if not profiles:
+                        return
+
+                    before = size_of(gdb)
+                    start = time.perf_counter()
+
+                    with run.stage(group.name, "optimize"):
+                        for fc, profile in profiles:
+                            apply_profile(gdb, fc, profile)
+
+                    elapsed = time.perf_counter() - start
+                    after = size_of(gdb)
+                    run.record(group.name, "optimize", "bytes", after)
+                    arcpy.AddMessage(
+                        f"{group.name}: optimized {len(profiles)} dataset(s) in {elapsed:.1f}s,"
+                        f" {before / 2**20:.1f} MiB -> {after / 2**20:.1f} MiB"
                     )
+
+                def _zip(title: str, gdb: str, gdb_zipped: str) -> None:
+                    start = time.perf_counter()
+                    with run.stage(title, "zip"):
+                        gdb_to_zip(gdb)
+
+                    size = size_of(gdb_zipped)
+                    run.record(title, "zip", "bytes", size)
+                    arcpy.AddMessage(
+                        f"{title}: zipped to {size / 2**20:.1f} MiB"
+                        f" in {time.perf_counter() - start:.1f}s"
+                    )
+
+                def _compare(group: str, subject: str, stage: str) -> None:
+                    # optimizing pays off downstream, so set this run's zip and upload times
+                    # against recent runs that didn't optimize the group
+                    now = run.total(subject, stage, "seconds")
+                    before = baseline(
+                        run.tool, subject, stage, "seconds", unless=(group, "optimize")
+                    )
+
+                    if now is None:
+                        return
+                    if before is None:
+                        arcpy.AddMessage(
+                            f"{subject}: {stage} took {now:.1f}s,"
+                            " no unoptimized run to compare against"
+                        )
+                    else:
+                        arcpy.AddMessage(
+                            f"{subject}: {stage} took {now:.1f}s optimized"
+                            f" vs {before:.1f}s unoptimized"
+                        )
+
+                _prog_helper("Downloading data...")
+                titles = [group.name for group in fcs]
+                pool.starmap(
+                    arcpy.management.CreateFileGDB,
+                    [(tmp_dir, title) for title in titles],
                 )
-                < steps
-            ):
-                time.sleep(1)
 
-            _prog_helper("Publishing feature layers...")
-            pool.starmap(publish_gdb, gdbs_remote)
+                gdbs = [f"{tmp_dir}\\{title}.gdb" for title in titles]
+                gdbs_zipped = [f"{tmp_dir}\\{title}.zip" for title in titles]
+
+                pool.starmap(_export, zip(fcs, gdbs))
+
+                if optimize:
+                    _prog_helper("Optimizing geodatabases for publishing...")
+                    pool.starmap(_optimize, zip(fcs, gdbs))
+
+                _prog_helper("Compressing geodatabases...")
+                pool.starmap(_zip, zip(titles, gdbs, gdbs_zipped))
+
+                _prog_helper("Publishing to portals...")
+                sessions = PortalSessions()
+
+                # the same portal may be listed once per account
+                labels = [
+                    f"{url} ({profile})" if profile else url
+                    for url, _, profile in targets
+                ]
+
+                def _fan_out(
+                    label: str, url: str, workers: Optional[int], profile: Optional[str]
+                ) -> None:
+                    publish_to_portal(
+                        sessions.get(url, profile or None),
+                        label,
+                        gdbs_zipped,
+                        titles,
+                        tag,
+                        workers or steps,
+                        run,
+                    )
+
+                with ThreadPool(len(targets)) as portal_pool:
+                    results = [
+                        (label, portal_pool.apply_async(_fan_out, (label, *target)))
+                        for label, target in zip(labels, targets)
+                    ]
+                    failed = []
+
+                    for label, result in results:
+                        try:
+                            result.get()
+                        except Exception as err:
+                            arcpy.AddWarning(f"{label}: {repr(err)}")
+                            failed.append(label)
+
+                if optimize:
+                    for group in fcs:
+                        if not any(
+                            fc in publish_profiles for fc in group.feature_classes
+                        ):
+                            continue
+
+                        _compare(group.name, group.name, "zip")
+                        for label in labels:
+                            if label not in failed:
+                                _compare(
+                                    group.name, f"{group.name} @ {label}", "upload"
+                                )
+
+                if failed:
+                    arcpy.AddError(f"Publishing failed for: {', '.join(failed)}")
+                    raise arcpy.ExecuteError
+        finally:
+            # retries leading up to a failure are the ones most worth seeing
+            report_retries()
 
     def getParameterInfo(self) -> list[arcpy.Parameter]:
         conn_aspen = arcpy.Parameter(
@@ -132,14 +224,40 @@ class UpdateAGOData:
         )
 
         conn_portal = arcpy.Parameter(
-            displayName="Portal Connection",
+            displayName="Portal Connections",
             name="conn_portal",
-            datatype="GPNetworkDataSource",
+            datatype="GPValueTable",
             parameterType="Required",
             direction="Input",
+            multiValue=True,
+        )
+        conn_portal.columns = [
+            ["GPString", "Portal URL"],
+            ["GPLong", "Concurrent Uploads"],
+            ["GPString", "ArcGIS Profile"],
+        ]
+
+        optimize = arcpy.Parameter(
+            displayName="Optimize for Publishing",
+            name="optimize",
+            datatype="GPBoolean",
+            parameterType="Optional",
+            direction="Input",
+        )
+        optimize.value = False
+
+        tile_threshold = arcpy.Parameter(
+            displayName="Tiled Export Threshold",
+            name="tile_threshold",
+            datatype="GPLong",
+            parameterType="Optional",
+            direction="Input",
         )
+        tile_threshold.value = 500_000
+        tile_threshold.filter.type = "Range"
+        tile_threshold.filter.list = [1, 2**31 - 1]
 
-        return [conn_aspen, conn_portal]
+        return [conn_aspen, conn_portal, optimize, tile_threshold]
 
     # fmt: off
     def isLicensed(self) -> bool: return True
@@ -0,0 +1,142 @@
+"""
+Checks job file parsing and parameter matching of the headless runner.
+
+Needs the ArcGIS Pro Python environment, since the toolbox modules import arcpy and arcgis.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+pytest.importorskip("arcpy")
+pytest.importorskip("arcgis")
+
+from colawater.batch import build_parameters, load_jobs
+
+
+def _write(tmp_path: Path, name: str, text: str) -> Path:
+    path = tmp_path / name
+    path.write_text(text)
+
+    return path
+
+
+def test_load_toml(tmp_path: Path) -> None:
+    path = _write(
+        tmp_path,
+        "jobs.toml",
+        """
+workers = 2
+
+[[jobs]]
+tool = "UpdateAGOData"
+[jobs.parameters]
+conn_portal = [["https://example.com", 3]]
+
+[[jobs]]
+name = "hydrants"
+tool = "CalculateFacilityIdentifiers"
+""",
+    )
+
+    jobs, workers = load_jobs(path)
+
+    assert workers == 2
+    assert [(job.name, job.tool) for job in jobs] == [
+        ("0-UpdateAGOData", "UpdateAGOData"),
+        ("hydrants", "CalculateFacilityIdentifiers"),
+    ]
+    assert jobs[0].parameters == {"conn_portal": [["https://example.com", 3]]}
+    assert jobs[1].parameters == {}
+
+
+def test_load_json(tmp_path: Path) -> None:
+    path = _write(
+        tmp_path,
+        "jobs.json",
+        json.dumps({"jobs": [{"tool": "UpdateAGOData", "parameters": {"a": 1}}]}),
+    )
+
+    jobs, workers = load_jobs(path)
+
+    assert workers is None
+    assert jobs[0].parameters == {"a": 1}
+
+
+@pytest.mark.parametrize(
+    "doc",
+    [
+        [{"tool": "UpdateAGOData"}],
+        {"jobs": {"tool": "UpdateAGOData"}},
+        {"jobs": ["UpdateAGOData"]},
+        {"jobs": [{"tool": "Nope"}]},
+        {"jobs": [{"tool": "UpdateAGOData", "parameters": [1]}]},
+        {"workers": 0, "jobs": []},
+        {"workers": "2", "jobs": []},
+        {"workers": True, "jobs": []},
+    ],
+)
+def test_load_malformed(tmp_path: Path, doc: Any) -> None:
+    path = _write(tmp_path, "jobs.json", json.dumps(doc))
+
+    with pytest.raises(ValueError):
+        load_jobs(path)
+
+
+class FakeParameter:
+    def __init__(
+        self, name: str, required: bool = True, multi: bool = False, value: Any = None
+    ) -> None:
+        self.name = name
+        self.parameterType = "Required" if required else "Optional"
+        self.multiValue = multi
+        self.value = value
+        self.values: Optional[list[Any]] = None
+
+
+class FakeTool:
+    def __init__(self) -> None:
+        self.updated = False
+
+    def getParameterInfo(self) -> list[FakeParameter]:
+        return [
+            FakeParameter("placeholder"),
+            FakeParameter("interval", value=2),
+            FakeParameter("inputs", multi=True),
+            FakeParameter("chunk_size", required=False),
+        ]
+
+    def updateParameters(self, parameters: list[FakeParameter]) -> None:
+        self.updated = True
+
+
+def test_build_parameters_by_name() -> None:
+    tool = FakeTool()
+
+    parameters = build_parameters(
+        tool, {"placeholder": "ABC", "inputs": [["layer", "Hydrant", 1]]}
+    )
+
+    assert [p.name for p in parameters] == [
+        "placeholder",
+        "interval",
+        "inputs",
+        "chunk_size",
+    ]
+    assert parameters[0].value == "ABC"
+    assert parameters[1].value == 2
+    assert parameters[2].values == [["layer", "Hydrant", 1]]
+    assert parameters[3].value is None
+    assert tool.updated
+
+
+def test_build_parameters_unknown() -> None:
+    with pytest.raises(ValueError, match="Unknown parameters"):
+        build_parameters(FakeTool(), {"placeholder": "ABC", "inputs": [], "nope": 1})
+
+
+def test_build_parameters_missing() -> None:
+    with pytest.raises(ValueError, match=r"Missing required parameters: \['inputs'\]"):
+        build_parameters(FakeTool(), {"placeholder": "ABC"})
@@ -0,0 +1,167 @@
+"""
+Checks that ``calculate_fids`` never reissues identifiers after an interrupted run.
+
+The layer is a list of rows behind fake edit sessions that commit on a clean exit and
+roll back on an exception, like ``arcpy.da.Editor``.
+
+Needs the ArcGIS Pro Python environment, since the toolbox modules import arcpy.
+"""
+
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+import pytest
+
+arcpy = pytest.importorskip("arcpy")
+
+from colawater.lib import desc
+from colawater.lib import layer as ly
+from colawater.toolbox.calculate_fids import lib
+from colawater.toolbox.calculate_fids.lib import AssetType, calculate_fids
+
+PLACEHOLDER = "ABC"
+
+
+class Crash(Exception):
+    pass
+
+
+class FakeTable:
+    def __init__(self, rows: int) -> None:
+        self.committed = [PLACEHOLDER] * rows
+        self.rows = list(self.committed)
+        self.crash_after: Optional[int] = None
+        self.writes = 0
+
+
+class FakeEditor:
+    def __init__(self, table: FakeTable) -> None:
+        self.table = table
+
+    def __enter__(self) -> "FakeEditor":
+        self.table.rows = list(self.table.committed)
+        return self
+
+    def __exit__(self, exc_type: Any, *args: Any) -> None:
+        if exc_type is None:
+            self.table.committed = list(self.table.rows)
+        else:
+            self.table.rows = list(self.table.committed)
+
+
+class FakeCursor:
+    def __init__(self, table: FakeTable, where: str) -> None:
+        self.table = table
+        self.value = where.split("'")[1]
+        self.index = -1
+
+    def __enter__(self) -> "FakeCursor":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+    def __iter__(self) -> Iterator[list[str]]:
+        for self.index, value in enumerate(self.table.rows):
+            if value == self.value:
+                yield [value]
+
+    def updateRow(self, row: tuple[Any, ...]) -> None:
+        if self.table.writes == self.table.crash_after:
+            raise Crash("connection lost")
+
+        self.table.writes += 1
+        self.table.rows[self.index] = row[0]
+
+
+@pytest.fixture
+def table(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> FakeTable:
+    table = FakeTable(10)
+
+    monkeypatch.setattr(lib, "_CHECKPOINT_DIR", tmp_path)
+    monkeypatch.setattr(desc, "full_path", lambda layer: "gdb\\waHydrant")
+    monkeypatch.setattr(desc, "path", lambda layer: "gdb")
+    monkeypatch.setattr(desc, "basename", lambda layer: "waHydrant")
+    monkeypatch.setattr(ly, "has_field", lambda layer, field: False)
+    monkeypatch.setattr(
+        ly,
+        "count_rows",
+        lambda layer, where="": table.committed.count(PLACEHOLDER),
+    )
+    monkeypatch.setattr(arcpy.da, "Editor", lambda workspace: FakeEditor(table))
+    monkeypatch.setattr(
+        arcpy.da,
+        "UpdateCursor",
+        lambda layer, fields, where: FakeCursor(table, where),
+    )
+    monkeypatch.setattr(arcpy, "SetProgressor", lambda *args: None)
+    monkeypatch.setattr(arcpy, "ResetProgressor", lambda: None)
+    monkeypatch.setattr(arcpy, "SetProgressorPosition", lambda *args: None)
+    monkeypatch.setattr(arcpy, "SetProgressorLabel", lambda *args: None)
+    monkeypatch.setattr(arcpy, "AddWarning", lambda message: None)
+    monkeypatch.setattr(arcpy, "AddError", lambda message: None)
+
+    return table
+
+
+def _crash(table: FakeTable, after: int, chunk_size: Optional[int]) -> None:
+    table.crash_after = after
+
+    with pytest.raises(arcpy.ExecuteError):
+        calculate_fids(None, AssetType.Hydrant, PLACEHOLDER, 2, 100, chunk_size)
+
+    table.crash_after = None
+
+
+def _assert_unique(table: FakeTable) -> None:
+    assert PLACEHOLDER not in table.committed
+    assert len(set(table.committed)) == len(table.committed)
+
+
+@pytest.mark.parametrize("rerun_chunk_size", [3, None])
+def test_rerun_after_chunked_crash_does_not_reissue(
+    table: FakeTable, rerun_chunk_size: Optional[int]
+) -> None:
+    # the first chunk of 3 rows commits, the second rolls back
+    _crash(table, 5, 3)
+    assert table.committed[:3] == ["100HYD", "102HYD", "104HYD"]
+    assert table.committed[3:] == [PLACEHOLDER] * 7
+
+    counter, updated = calculate_fids(
+        None, AssetType.Hydrant, PLACEHOLDER, 2, 100, rerun_chunk_size
+    )
+
+    assert updated == 7
+    _assert_unique(table)
+    assert not list(lib._CHECKPOINT_DIR.glob("*.json"))
+    assert counter > max(int(facid[:-3]) for facid in table.committed)
+
+
+@pytest.mark.parametrize("chunk_size", [3, None])
+def test_rerun_after_crash_completes(
+    table: FakeTable, chunk_size: Optional[int]
+) -> None:
+    _crash(table, 5, chunk_size)
+
+    calculate_fids(None, AssetType.Hydrant, PLACEHOLDER, 2, 100, chunk_size)
+
+    _assert_unique(table)
+
+
+def test_rerun_with_other_inputs_is_refused(table: FakeTable) -> None:
+    _crash(table, 5, 3)
+    before = list(table.committed)
+
+    with pytest.raises(arcpy.ExecuteError):
+        calculate_fids(None, AssetType.Hydrant, PLACEHOLDER, 2, 0, None)
+
+    assert table.committed == before
+
+
+def test_unchunked_run_without_checkpoint_starts_at_start(table: FakeTable) -> None:
+    counter, updated = calculate_fids(
+        None, AssetType.Hydrant, PLACEHOLDER, 2, 100, None
+    )
+
+    assert (counter, updated) == (120, 10)
+    assert table.committed == [f"{100 + 2 * i}HYD" for i in range(10)]
@@ -0,0 +1,141 @@
+"""
+Checks the transient error classification and cutoffs of ``retrying``.
+
+Needs the ArcGIS Pro Python environment, since the error module imports arcpy.
+"""
+
+from typing import Callable, Iterator
+
+import pytest
+
+arcpy = pytest.importorskip("arcpy")
+
+from colawater.lib import error
+from colawater.lib.error import RetryPolicy, report_retries, retry_counts, retrying
+
+
+class FixedDelay(RetryPolicy):
+    def __init__(self, delay: float, attempts: int = 5, budget: float = 300.0) -> None:
+        super().__init__(attempts=attempts, budget=budget)
+        self.fixed = delay
+
+    def delay(self, attempt: int) -> float:
+        return self.fixed
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> Iterator[list[float]]:
+    slept: list[float] = []
+    monkeypatch.setattr(error.time, "sleep", slept.append)
+    monkeypatch.setattr(arcpy, "AddWarning", lambda message: None)
+    retry_counts.clear()
+
+    yield slept
+
+    retry_counts.clear()
+
+
+def _failing(err: Exception, times: int) -> tuple[list[int], Callable[[], str]]:
+    calls = [0]
+
+    def f() -> str:
+        calls[0] += 1
+        if calls[0] <= times:
+            raise err
+        return "ok"
+
+    return calls, f
+
+
+@pytest.mark.parametrize(
+    "err",
+    [
+        RuntimeError("Cannot acquire a lock."),
+        RuntimeError("Failure to access the DBMS server [Network I/O error]"),
+        OSError("The read operation timed out"),
+        ConnectionResetError(),
+        TimeoutError(),
+    ],
+)
+def test_transient(err: Exception) -> None:
+    assert RetryPolicy().is_transient(err)
+
+
+@pytest.mark.parametrize(
+    "err",
+    [
+        RuntimeError("Attribute column not found"),
+        ValueError("lock"),
+        KeyError("timed"),
+    ],
+)
+def test_not_transient(err: Exception) -> None:
+    assert not RetryPolicy().is_transient(err)
+
+
+def test_delay_is_capped() -> None:
+    policy = RetryPolicy(base_delay=2.0, max_delay=5.0)
+
+    assert all(0 <= policy.delay(attempt) <= 5.0 for attempt in range(20))
+
+
+def test_retries_until_success(sleeps: list[float]) -> None:
+    calls, f = _failing(RuntimeError("Cannot acquire a lock."), 2)
+
+    assert retrying(FixedDelay(1.0, attempts=5))(f)() == "ok"
+    assert calls == [3]
+    assert sleeps == [1.0, 1.0]
+
+
+def test_non_transient_is_not_retried(sleeps: list[float]) -> None:
+    calls, f = _failing(RuntimeError("Attribute column not found"), 1)
+
+    with pytest.raises(RuntimeError):
+        retrying(FixedDelay(1.0))(f)()
+
+    assert calls == [1]
+    assert sleeps == []
+
+
+def test_attempt_cutoff(sleeps: list[float]) -> None:
+    calls, f = _failing(TimeoutError(), 10)
+
+    with pytest.raises(TimeoutError):
+        retrying(FixedDelay(1.0, attempts=3, budget=100.0))(f)()
+
+    assert calls == [3]
+    assert sleeps == [1.0, 1.0]
+
+
+def test_budget_cutoff(sleeps: list[float]) -> None:
+    calls, f = _failing(TimeoutError(), 10)
+
+    # a third sleep would take the total to 30s, over the 25s budget
+    with pytest.raises(TimeoutError):
+        retrying(FixedDelay(10.0, attempts=10, budget=25.0))(f)()
+
+    assert calls == [3]
+    assert sleeps == [10.0, 10.0]
+
+
+def test_counts_per_site(sleeps: list[float], monkeypatch: pytest.MonkeyPatch) -> None:
+    policy = FixedDelay(0.0)
+    _, first = _failing(TimeoutError(), 2)
+    _, second = _failing(TimeoutError(), 1)
+    first.__qualname__ = "first"
+    second.__qualname__ = "second"
+
+    retrying(policy)(first)()
+    retrying(policy)(second)()
+
+    assert retry_counts == {f"{__name__}.first": 2, f"{__name__}.second": 1}
+
+    messages: list[str] = []
+    monkeypatch.setattr(arcpy, "AddMessage", messages.append)
+    report_retries()
+
+    assert messages == [
+        f"Retried {__name__}.first 2 time(s)",
+        f"Retried {__name__}.second 1 time(s)",
+    ]
+    assert not retry_counts
@@ -0,0 +1,160 @@
+"""
+Checks run recording and regression detection against a throwaway history database.
+
+Needs the ArcGIS Pro Python environment, since the history module imports arcpy.
+"""
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("arcpy")
+
+from colawater.lib.history import Recorder, baseline, connect, regressions
+
+
+@pytest.fixture
+def db(tmp_path: Path) -> Path:
+    return tmp_path / "history.db"
+
+
+def _run(
+    db: Path, started: float, seconds: float, ok: bool = True, **extra: float
+) -> None:
+    conn = connect(db)
+
+    with conn:
+        run_id = conn.execute(
+            "INSERT INTO runs (tool, started, finished, ok) VALUES ('Tool', ?, ?, ?)",
+            (started, started + seconds, ok),
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO metrics (run_id, subject, stage, metric, value)"
+            " VALUES (?, ?, ?, ?, ?)",
+            [(run_id, "Water", "export", "seconds", seconds)]
+            + [(run_id, "Water", "export", metric, v) for metric, v in extra.items()],
+        )
+
+    conn.close()
+
+
+def test_needs_two_runs(db: Path) -> None:
+    assert regressions("Tool", path=db) == []
+
+    _run(db, 1, 100)
+
+    assert regressions("Tool", path=db) == []
+
+
+def test_flags_latest_against_median(db: Path) -> None:
+    # the outlier at 1000s would drag a mean above the latest run, but not the median
+    for started, seconds in enumerate([100, 110, 1000, 90, 100], 1):
+        _run(db, started, seconds)
+    _run(db, 10, 200)
+
+    (flagged,) = regressions("Tool", path=db)
+
+    assert (flagged.subject, flagged.stage, flagged.metric) == (
+        "Water",
+        "export",
+        "seconds",
+    )
+    assert (flagged.latest, flagged.baseline) == (200, 100)
+
+
+def test_window_limits_baseline(db: Path) -> None:
+    # only the 2 runs before the latest count, so the slow early runs are ignored
+    for started, seconds in enumerate([500, 500, 500, 100, 100], 1):
+        _run(db, started, seconds)
+    _run(db, 10, 200)
+
+    assert [r.baseline for r in regressions("Tool", window=2, path=db)] == [100]
+    assert regressions("Tool", window=5, path=db) == []
+
+
+def test_threshold(db: Path) -> None:
+    _run(db, 1, 100)
+    _run(db, 2, 140)
+
+    assert regressions("Tool", threshold=1.5, path=db) == []
+    assert len(regressions("Tool", threshold=1.2, path=db)) == 1
+
+
+def test_minimum_delta_per_metric(db: Path) -> None:
+    # tripling is below each metric's minimum increase, so nothing is flagged
+    _run(db, 1, 1, bytes=1000, rows=100)
+    _run(db, 2, 3, bytes=3000, rows=300)
+
+    assert regressions("Tool", path=db) == []
+
+    _run(db, 3, 30, bytes=2**30, rows=10_000)
+
+    assert {r.metric for r in regressions("Tool", path=db)} == {
+        "seconds",
+        "bytes",
+        "rows",
+    }
+
+
+def test_skips_failed_runs(db: Path) -> None:
+    _run(db, 1, 100)
+    _run(db, 2, 1000, ok=False)
+    _run(db, 3, 110)
+
+    # the failed run is neither the latest nor part of the baseline
+    assert regressions("Tool", threshold=1.05, window=1, path=db)[0].baseline == 100
+
+    _run(db, 4, 5000, ok=False)
+
+    assert regressions("Tool", threshold=1.05, window=1, path=db)[0].latest == 110
+
+
+def test_recorder_sums_stages(db: Path) -> None:
+    for _ in range(2):
+        with Recorder("Tool", db) as run:
+            run.record("Water", "export", "rows", 10)
+            run.record("Water", "export", "rows", 20)
+
+    with Recorder("Tool", db) as run:
+        run.record("Water", "export", "rows", 3000)
+
+    (flagged,) = regressions("Tool", path=db)
+
+    assert (flagged.latest, flagged.baseline) == (3000, 30)
+
+
+def test_recorder_marks_failed_runs(db: Path) -> None:
+    with pytest.raises(RuntimeError):
+        with Recorder("Tool", db):
+            raise RuntimeError
+
+    conn = connect(db)
+    assert conn.execute("SELECT ok FROM runs").fetchall() == [(0,)]
+    conn.close()
+
+
+def test_baseline_leaves_out_runs_with_stage(db: Path) -> None:
+    for zip_seconds, optimized in [(10, False), (20, False), (2, True), (30, False)]:
+        with Recorder("Tool", db) as run:
+            run.record("Water", "zip", "seconds", zip_seconds)
+            if optimized:
+                run.record("Water", "optimize", "seconds", 1)
+
+    assert baseline("Tool", "Water", "zip", "seconds", path=db) == 15
+    assert (
+        baseline(
+            "Tool", "Water", "zip", "seconds", unless=("Water", "optimize"), path=db
+        )
+        == 20
+    )
+    assert baseline("Tool", "Water", "zip", "seconds", window=1, path=db) == 30
+    assert baseline("Tool", "Sewer", "zip", "seconds", path=db) is None
+
+
+def test_recorder_total(db: Path) -> None:
+    run = Recorder("Tool", db)
+    run.record("Water", "zip", "seconds", 1)
+    run.record("Water", "zip", "seconds", 2)
+
+    assert run.total("Water", "zip", "seconds") == 3
+    assert run.total("Water", "upload", "seconds") is None
@@ -0,0 +1,102 @@
+"""
+Checks that ``Progress`` throttles progressor updates and stays cheap per row.
+
+Needs the ArcGIS Pro Python environment, since the progress module imports arcpy.
+"""
+
+import timeit
+from typing import Any, Callable
+
+import pytest
+
+arcpy = pytest.importorskip("arcpy")
+
+from colawater.lib.progress import Progress
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def reports(monkeypatch: pytest.MonkeyPatch) -> list[Any]:
+    calls: list[Any] = []
+    monkeypatch.setattr(arcpy, "SetProgressor", lambda *args: None)
+    monkeypatch.setattr(arcpy, "ResetProgressor", lambda: None)
+    monkeypatch.setattr(arcpy, "SetProgressorPosition", calls.append)
+    monkeypatch.setattr(arcpy, "SetProgressorLabel", lambda label: None)
+
+    return calls
+
+
+def test_reports_every_interval_rows(reports: list[Any]) -> None:
+    clock = FakeClock()
+
+    with Progress("rows", 10_000, 0.5, 1000, clock) as progress:
+        for _ in range(10_000):
+            clock.now += 1e-6
+            progress.step()
+
+    assert reports == list(range(1000, 10_001, 1000))
+
+
+def test_reports_every_interval_seconds(reports: list[Any]) -> None:
+    clock = FakeClock()
+
+    with Progress("rows", 100, 0.5, 1_000_000, clock) as progress:
+        for _ in range(100):
+            clock.now += 0.125
+            progress.step()
+
+    # each row takes an eighth of a second, so a report every 4 rows
+    assert len(reports) == 25
+    assert reports[:3] == [4, 8, 12]
+
+
+def test_no_report_before_either_threshold(reports: list[Any]) -> None:
+    clock = FakeClock()
+
+    with Progress("rows", 100, 0.5, 1000, clock) as progress:
+        for _ in range(100):
+            clock.now += 0.001
+            progress.step()
+
+    assert reports == []
+
+
+def _loop(rows: int, step: Callable[[], None]) -> None:
+    # stand-in for the per-row work of the facility identifier cursor loop
+    for counter in range(rows):
+        row = [None, f"ABC{counter}"]
+        row[0] = row[1]
+        step()
+
+
+def test_step_overhead_is_small(reports: list[Any]) -> None:
+    """
+    Compares a bare loop with the same loop calling ``Progress.step`` on every row.
+
+    The per-row work here is far cheaper than an ``updateRow`` against an enterprise
+    geodatabase, which takes tens of microseconds, so only the absolute overhead per row
+    is checked.
+    """
+    rows = 100_000
+
+    bare = min(timeit.repeat(lambda: _loop(rows, lambda: None), number=1, repeat=7))
+
+    def stepped() -> None:
+        with Progress("rows", rows) as progress:
+            _loop(rows, progress.step)
+
+    throttled = min(timeit.repeat(stepped, number=1, repeat=7))
+
+    print(
+        f"bare {bare * 1e9 / rows:.0f} ns/row,"
+        f" with Progress.step {throttled * 1e9 / rows:.0f} ns/row"
+    )
+
+    assert (throttled - bare) / rows < 2e-6
@@ -0,0 +1,199 @@
+"""
+Checks ``publish_to_portal`` and ``PortalSessions`` against local fake portals.
+
+Needs the ArcGIS Pro Python environment, since the toolbox modules import arcpy and arcgis.
+"""
+
+import itertools
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+pytest.importorskip("arcpy")
+pytest.importorskip("arcgis")
+
+from colawater.lib.history import Recorder
+from colawater.toolbox.update_ago_data.lib import PortalSessions, publish_to_portal
+
+_ids = itertools.count()
+
+
+class FakeItem:
+    def __init__(self, portal: "FakePortal", title: str, tags: list[str]) -> None:
+        self.portal = portal
+        self.id = next(_ids)
+        self.created = self.id
+        self.title = title
+        self.tags = tags
+        self.type = "File Geodatabase"
+
+    def delete(self) -> None:
+        self.portal.items.remove(self)
+
+    def publish(self, **kwargs: Any) -> None:
+        time.sleep(self.portal.delay)
+        self.portal.published.append(self.title)
+
+
+class FakeFolder:
+    def __init__(self, portal: "FakePortal") -> None:
+        self.portal = portal
+
+    def list(self) -> list[FakeItem]:
+        return list(self.portal.items)
+
+    def add(self, item_properties: Any, file: str) -> None:
+        time.sleep(self.portal.delay)
+        self.portal.items.append(
+            FakeItem(self.portal, item_properties.title, item_properties.tags)
+        )
+
+
+class FakeFolders:
+    def __init__(self, portal: "FakePortal") -> None:
+        self.portal = portal
+
+    def create(self, name: str) -> FakeFolder:
+        raise Exception("folder exists")
+
+    def get(self, name: str) -> FakeFolder:
+        return FakeFolder(self.portal)
+
+
+class FakeContent:
+    def __init__(self, portal: "FakePortal") -> None:
+        self.portal = portal
+        self.folders = FakeFolders(portal)
+
+    def search(self, **kwargs: Any) -> list[FakeItem]:
+        return list(self.portal.items)
+
+
+class FakePortal:
+    def __init__(self, url: str, delay: float = 0.0) -> None:
+        self.url = url
+        self.delay = delay
+        self.items: list[FakeItem] = []
+        self.published: list[str] = []
+        self.content = FakeContent(self)
+
+
+@pytest.fixture
+def zipped(tmp_path: Path) -> list[str]:
+    paths = []
+
+    for title in ("A", "B", "C"):
+        path = tmp_path / f"{title}.zip"
+        path.write_bytes(b"zip")
+        paths.append(str(path))
+
+    return paths
+
+
+def test_replaces_and_publishes_every_title_once(zipped: list[str]) -> None:
+    portal = FakePortal("fake")
+    stale = FakeItem(portal, "A", ["tag"])
+    portal.items.append(stale)
+
+    publish_to_portal(
+        portal, "fake", zipped, ["A", "B", "C"], "tag", 3, Recorder("T"), 0
+    )
+
+    assert stale not in portal.items
+    assert sorted(item.title for item in portal.items) == ["A", "B", "C"]
+    assert sorted(portal.published) == ["A", "B", "C"]
+
+
+def test_duplicate_uploads_are_published_once(
+    zipped: list[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    portal = FakePortal("fake")
+    # a late duplicate, as left by an upload that timed out after creating its item
+    portal.items.append(FakeItem(portal, "B", ["tag"]))
+    add = FakeFolder.add
+
+    def _add_twice(self: FakeFolder, item_properties: Any, file: str) -> None:
+        add(self, item_properties, file)
+        if item_properties.title == "B":
+            add(self, item_properties, file)
+
+    monkeypatch.setattr(FakeFolder, "add", _add_twice)
+    publish_to_portal(
+        portal, "fake", zipped, ["A", "B", "C"], "tag", 3, Recorder("T"), 0
+    )
+
+    assert sorted(portal.published) == ["A", "B", "C"]
+    assert sorted(item.title for item in portal.items) == ["A", "B", "C"]
+
+
+def test_slow_portal_does_not_hold_up_fast_portal(zipped: list[str]) -> None:
+    fast, slow = FakePortal("fast"), FakePortal("slow", delay=0.3)
+    finished: dict[str, float] = {}
+    start = time.perf_counter()
+
+    def _run(portal: FakePortal) -> None:
+        publish_to_portal(
+            portal, portal.url, zipped, ["A", "B", "C"], "tag", 3, Recorder("T"), 0
+        )
+        finished[portal.url] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=_run, args=(p,)) for p in (fast, slow)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert finished["fast"] < 0.3 <= finished["slow"]
+    assert sorted(slow.published) == ["A", "B", "C"]
+
+
+def test_wait_for_uploads_times_out(zipped: list[str]) -> None:
+    portal = FakePortal("fake")
+    # uploads that never show up in search, as when the portal is still indexing them
+    portal.content.search = lambda **kwargs: [  # type: ignore[method-assign]
+        item for item in portal.items if item.title != "C"
+    ]
+
+    with pytest.raises(TimeoutError, match=r"\['C'\] not available"):
+        publish_to_portal(
+            portal, "fake", zipped, ["A", "B", "C"], "tag", 3, Recorder("T"), 0.01, 0.1
+        )
+
+    assert portal.published == []
+
+
+def test_sessions_are_shared_within_a_run_only() -> None:
+    connects: list[str] = []
+
+    def _connect(url: str, profile: Optional[str] = None) -> FakePortal:
+        connects.append(url)
+        return FakePortal(url)
+
+    sessions = PortalSessions(_connect)
+    threads = [threading.Thread(target=sessions.get, args=("a",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sessions.get("a") is sessions.get("a")
+    assert sessions.get("b") is not sessions.get("a")
+    assert connects == ["a", "b"]
+    assert PortalSessions(_connect).get("a") is not sessions.get("a")
+
+
+def test_sessions_are_per_profile() -> None:
+    connects: list[tuple[str, Optional[str]]] = []
+
+    def _connect(url: str, profile: Optional[str] = None) -> FakePortal:
+        connects.append((url, profile))
+        return FakePortal(url)
+
+    sessions = PortalSessions(_connect)
+
+    assert sessions.get("a", "staging") is sessions.get("a", "staging")
+    assert sessions.get("a", "staging") is not sessions.get("a")
+    assert connects == [("a", "staging"), ("a", None)]